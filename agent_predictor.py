@@ -1,14 +1,114 @@
-import torch
-import loan_model
+import numpy as np
+import loan_features
+import model_registry
+import inference_backends
 import os
 import db_config
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+import select
+import socket
 import time
 import sys
 from decimal import Decimal
+import hashlib
 
 # Configuration
-POLL_INTERVAL = 10 
-MODEL_PATH = "loan_model.pth"
+POLL_INTERVAL = 10 # Fallback heartbeat; new work normally wakes the agent via LISTEN/NOTIFY
+NOTIFY_CHANNEL = 'loan_pending'
+PREDICT_CHUNK_SIZE = int(os.environ.get('PREDICT_CHUNK_SIZE', 4096)) # Rows per forward pass
+PENDING_PAGE_SIZE = int(os.environ.get('PENDING_PAGE_SIZE', 5000)) # Rows claimed, scored and written per page
+
+# Work Queue: each worker claims pages of Pending applications for LEASE_SECONDS.
+# Claims left behind by a crashed worker expire and are picked up again.
+WORKER_ID = os.environ.get('WORKER_ID') or f"{socket.gethostname()}:{os.getpid()}"
+LEASE_SECONDS = int(os.environ.get('CLAIM_LEASE_SECONDS', 300))
+
+# Incremental Re-scoring: a decision is fingerprinted from its raw inputs and the deciding model version
+# (the model registry version id, see model_registry.py).
+# A re-queued application whose fingerprint matches its last prediction gets that decision back
+# without inference or a new Predictions row.
+RULES_VERSION = 'rules' # "Model version" of decisions made by the Rule-Based Teacher
+
+# Expired claims go back to Pending (and NOTIFY other workers) before a drain starts
+RECLAIM_QUERY = """
+    UPDATE LoanApplications
+    SET Status = 'Pending', ClaimedBy = NULL, LeaseExpiresAt = NULL
+    WHERE Status = 'InProgress' AND LeaseExpiresAt < NOW()
+"""
+
+# Claimed Applications: (AppID, ReqAmount, Income, Score, Debt, DTI, Collateral, AccountAge, AvgTrans, Priority, Loyalty,
+#                        LastFingerprint, LastDecision)
+# FIXED: Added FP.ExistingDebt at index 4
+# LastFingerprint / LastDecision come from the application's latest prediction (NULL if none).
+# SKIP LOCKED lets concurrent workers claim disjoint pages without blocking each other.
+# Reads the partial index idx_loanapplications_pending in ApplicationID order;
+# = ANY(ARRAY(...)) keeps the outer UPDATE on primary-key lookups instead of a hash join.
+CLAIM_QUERY = """
+    WITH claimed AS (
+        UPDATE LoanApplications
+        SET Status = 'InProgress', ClaimedBy = %(worker)s,
+            LeaseExpiresAt = NOW() + make_interval(secs => %(lease)s)
+        WHERE ApplicationID = ANY(ARRAY(
+            SELECT ApplicationID FROM LoanApplications
+            WHERE Status = 'Pending'
+            ORDER BY ApplicationID
+            LIMIT %(limit)s
+            FOR UPDATE SKIP LOCKED
+        ))
+        RETURNING ApplicationID, ApplicantID, RequestAmount, ProcessingPriority
+    )
+    SELECT C.ApplicationID, C.RequestAmount, 
+           FP.AnnualIncome, FP.CreditScore, FP.ExistingDebt, FP.DebtToIncomeRatio, FP.CollateralValue,
+           FP.AccountAgeDays, FP.AvgTransactionCount, C.ProcessingPriority, A.LoyaltyPoints,
+           LP.FeatureFingerprint, LP.Decision
+    FROM claimed C
+    JOIN Applicants A ON C.ApplicantID = A.ApplicantID
+    JOIN FinancialProfile FP ON A.ApplicantID = FP.ApplicantID
+    LEFT JOIN LATERAL (
+        SELECT P.FeatureFingerprint, P.Decision FROM Predictions P
+        WHERE P.ApplicationID = C.ApplicationID
+        ORDER BY P.PredictionID DESC
+        LIMIT 1
+    ) LP ON TRUE
+    ORDER BY C.ApplicationID
+"""
+
+# Decision Write-Back: {worker} is filled in per worker, VALUES %s by execute_values
+WRITE_DECISIONS_QUERY = """
+    WITH D (ApplicationID, Status, Score, Amount, Risk, Reasoning, Fingerprint, ModelVersion) AS (VALUES %s),
+    updated AS (
+        UPDATE LoanApplications AS LA
+        SET Status = D.Status, ClaimedBy = NULL, LeaseExpiresAt = NULL
+        FROM D
+        WHERE LA.ApplicationID = D.ApplicationID
+          AND LA.Status = 'InProgress' AND LA.ClaimedBy = {worker}
+        RETURNING LA.ApplicationID
+    )
+    INSERT INTO Predictions (ApplicationID, PredictedEligibilityScore, RecommendedLoanAmount, ModelRiskLevel, Reasoning,
+                             Decision, FeatureFingerprint, ModelVersion)
+    SELECT D.ApplicationID, D.Score, D.Amount, D.Risk, D.Reasoning, D.Status, D.Fingerprint, D.ModelVersion
+    FROM D JOIN updated U ON U.ApplicationID = D.ApplicationID
+"""
+
+# Unchanged Re-evaluations: put back the last decision, same claim guard, no new Predictions row
+RESTORE_DECISIONS_QUERY = """
+    UPDATE LoanApplications AS LA
+    SET Status = R.Status, ClaimedBy = NULL, LeaseExpiresAt = NULL
+    FROM (VALUES %s) AS R (ApplicationID, Status)
+    WHERE LA.ApplicationID = R.ApplicationID
+      AND LA.Status = 'InProgress' AND LA.ClaimedBy = {worker}
+"""
+
+# Dashboard rollups (ApplicationStatusCounts / DecisionStats) grow by a few delta rows per statement;
+# each drain folds them back to one row per group
+COMPACT_STATS_QUERY = "SELECT compact_decision_stats()"
+
+# Reason Codes (bit flags) produced by the vectorized teacher
+REASON_LOW_SCORE = 1
+REASON_HIGH_DTI = 2
+REASON_LOW_INCOME = 4
+ELIGIBLE_REASON = "Eligible based on CIBIL and Income norms"
 
 
 def evaluate_application(app):
@@ -75,6 +175,116 @@ def evaluate_application(app):
         'Reason': "Eligible based on CIBIL and Income norms"
     }
 
+def teacher_columns(rows):
+    # Columnar view of the fields used by the Ground Truth Rules
+    # Returns float64 arrays: (ReqAmount, Income, Score, DTI, Collateral), NULLs as 0
+    cols = loan_features.rows_to_array(rows, 1, 7)
+    return cols[:, 0], cols[:, 1], np.trunc(cols[:, 2]), cols[:, 4], cols[:, 5]
+
+def evaluate_applications_batch(req_amount, income, score, dti, collateral):
+    # Vectorized version of evaluate_application over whole columns.
+    # Same rules and same float operations, so decisions match the scalar version exactly.
+    # Scores and Amounts are returned unrounded and reasons as bit flags;
+    # use teacher_result / teacher_reason to materialize a row when it is written.
+    reason_codes = ((score < 600) * REASON_LOW_SCORE
+                    | (dti > 0.50) * REASON_HIGH_DTI
+                    | (income < 250000) * REASON_LOW_INCOME)
+    approved = reason_codes == 0
+    
+    # Loan Amount Calculation (5x annual income + 70% LTV, 80% haircut below 700)
+    loan_capacity = income * 5
+    loan_capacity = np.where(collateral > 0, loan_capacity + collateral * 0.7, loan_capacity)
+    medium = score < 700
+    loan_capacity = np.where(medium, loan_capacity * 0.8, loan_capacity)
+    
+    return {
+        'Status': np.where(approved, 'Approved', 'Rejected'),
+        'Score': np.where(approved, (score / 900) * (1 - dti), 0.0),
+        'Amount': np.where(approved, np.minimum(req_amount, loan_capacity), 0.0),
+        'Risk': np.where(approved, np.where(medium, 'Medium', 'Low'), 'High'),
+        'ReasonCode': reason_codes,
+        'CreditScore': score,
+        'DTI': dti
+    }
+
+def teacher_reason(batch, i):
+    # Builds the reason string for row i of an evaluate_applications_batch result
+    code = int(batch['ReasonCode'][i])
+    if code == 0:
+        return ELIGIBLE_REASON
+    
+    reasons = []
+    if code & REASON_LOW_SCORE:
+        reasons.append(f"CIBIL Score {int(batch['CreditScore'][i])} is below minimum 600")
+    if code & REASON_HIGH_DTI:
+        reasons.append(f"Debt Burden Ratio {float(batch['DTI'][i])*100:.1f}% exceeds 50%")
+    if code & REASON_LOW_INCOME:
+        reasons.append("Annual Income below 2.5 Lakhs")
+    return "; ".join(reasons)
+
+def teacher_result(batch, i):
+    # Materializes row i of an evaluate_applications_batch result as an evaluate_application dict
+    return {
+        'Status': str(batch['Status'][i]),
+        'Score': round(float(batch['Score'][i]), 2),
+        'Amount': round(float(batch['Amount'][i]), 2),
+        'Risk': str(batch['Risk'][i]),
+        'Reason': teacher_reason(batch, i)
+    }
+
+def teacher_labels(rows):
+    # Training labels for claim-layout rows: 1.0 where the teacher approves, else 0.0
+    teacher = evaluate_applications_batch(*teacher_columns(rows))
+    return (teacher['Status'] == 'Approved').astype(np.float32)
+
+def write_decisions(cursor, decisions, worker_id):
+    # Bulk write-back: a single statement per batch instead of 2 round trips per application.
+    # Only applications still claimed by this worker are updated, and only those get a
+    # Predictions row, so a lost lease or a reset to Pending never produces a duplicate.
+    # Decision Structure: (AppID, Status, Score, Amount, Risk, Reasoning, Fingerprint, ModelVersion)
+    if not decisions:
+        return
+    
+    query = sql.SQL(WRITE_DECISIONS_QUERY).format(worker=sql.Literal(worker_id))
+    execute_values(cursor, query, decisions, page_size=len(decisions))
+
+def restore_decisions(cursor, restored, worker_id):
+    # Restored Structure: (AppID, Status) - applications whose inputs did not change
+    if not restored:
+        return
+    
+    query = sql.SQL(RESTORE_DECISIONS_QUERY).format(worker=sql.Literal(worker_id))
+    execute_values(cursor, query, restored, page_size=len(restored))
+
+def decision_fingerprints(rows, version):
+    # Hash of everything a decision depends on: ReqAmount and the 9 raw feature inputs (row[1:11]),
+    # plus the deciding model's version. Raw values rather than normalized features, because
+    # normalization caps Income while the recommended Amount uses the uncapped value.
+    raw = loan_features.rows_to_array(rows, 1, 2 + len(loan_features.FEATURE_COLUMNS))
+    prefix = version.encode()
+    return [hashlib.blake2b(prefix + values.tobytes(), digest_size=16).hexdigest() for values in raw]
+
+def iter_claimed_pages(conn, worker_id, page_size):
+    # Claims and yields pages of pending applications until the queue is drained.
+    # Each claim is committed straight away so other workers skip these rows;
+    # the caller commits the decisions for a page before the next claim.
+    cursor = conn.cursor()
+    cursor.execute(RECLAIM_QUERY)
+    conn.commit()
+    while True:
+        cursor.execute(CLAIM_QUERY, {'worker': worker_id, 'lease': LEASE_SECONDS, 'limit': page_size})
+        rows = cursor.fetchall()
+        conn.commit()
+        if not rows:
+            break
+        yield rows
+
+def compact_decision_stats(conn):
+    # Folds the dashboard rollup deltas our triggers appended during the drain (see setup_postgres.sql)
+    cursor = conn.cursor()
+    cursor.execute(COMPACT_STATS_QUERY)
+    conn.commit()
+
 def run_float(val):
     if isinstance(val, Decimal):
         return float(val)
@@ -82,203 +292,185 @@ def run_float(val):
         return 0.0
     return float(val)
 
-def bootstrap_training(conn, model_path):
+def load_promoted_model(watcher):
+    # Training no longer happens here (see retrain_agent.py); serve whatever the registry promotes
     print("Checking for existing model...")
-    if os.path.exists(model_path):
-        print(f"Loading existing model from {model_path}")
-        model = loan_model.LoanNet()
-        model.load_state_dict(torch.load(model_path))
-        return model
-    
-    print("No model found. Checking if we can bootstrap from pending data...")
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM LoanApplications WHERE Status='Pending'")
-    pending_count = cursor.fetchone()[0]
+    model_registry.import_legacy_model()
+    if watcher.poll(force=True):
+        print(f"Loading existing model {watcher.version} from the registry")
+    else:
+        print("No promoted model yet. Running in Fallback Rule-Based Mode until retrain_agent.py publishes one.")
+    return watcher.scorer
     
-    if pending_count < 100: # Lowered threshold for cloud demo
-        print("Not enough data to bootstrap model (Need > 100). running in Fallback Rule-Based Mode.")
+def open_listener():
+    # Dedicated autocommit connection subscribed to new-work notifications
+    # (see notify_pending_application in setup_postgres.sql)
+    conn = db_config.get_connection()
+    if not conn:
+        return None
+    try:
+        conn.autocommit = True
+        conn.cursor().execute(f"LISTEN {NOTIFY_CHANNEL}")
+        return conn
+    except Exception as e:
+        print(f"LISTEN failed, polling every {POLL_INTERVAL}s: {e}")
+        conn.close()
         return None
 
-    print(f"Bootstrapping Model with {pending_count} pending applications...")
-    print("Step 1: labeling using Rule-Based Teacher...")
+def wait_for_work(listener, timeout):
+    # Blocks until a NOTIFY arrives or the heartbeat timeout passes.
+    # Returns the listener, or None if it broke and must be reopened.
+    if listener is None:
+        time.sleep(timeout)
+        return None
+    try:
+        if select.select([listener], [], [], timeout)[0]:
+            listener.poll()
+            listener.notifies.clear()
+        return listener
+    except Exception as e:
+        print(f"Listener connection lost: {e}")
+        listener.close()
+        return None
+
+def split_unchanged(rows, version):
+    # Separates re-queued applications whose inputs match their last prediction.
+    # Returns (rows to score, their fingerprints, restored (AppID, LastDecision) pairs)
+    fingerprints = decision_fingerprints(rows, version)
+    changed, changed_fingerprints, restored = [], [], []
+    for row, fingerprint in zip(rows, fingerprints):
+        if row[12] is not None and row[11] == fingerprint:
+            restored.append((row[0], row[12]))
+        else:
+            changed.append(row)
+            changed_fingerprints.append(fingerprint)
+    return changed, changed_fingerprints, restored
+
+def decide_batch(scorer, rows, version):
+    # scorer: the promoted model in an inference backend (see inference_backends.py), or None
+    # version: the model registry version of `scorer`, RULES_VERSION without a model
+    # Scores one page of pending rows.
+    # Returns (decisions for write_decisions, unchanged applications for restore_decisions)
+    # If we still don't have a model (e.g. initial count < 1000), use rule based
+    use_model = (scorer is not None)
     
-    # Select data: (AppID, ReqAmount, Income, Score, Debt, DTI, Collateral, AccountAge, AvgTrans, Priority, Loyalty)
-    # FIXED: Added FP.ExistingDebt at index 4
-    cursor.execute("""
-        SELECT LA.ApplicationID, LA.RequestAmount, 
-               FP.AnnualIncome, FP.CreditScore, FP.ExistingDebt, FP.DebtToIncomeRatio, FP.CollateralValue,
-               FP.AccountAgeDays, FP.AvgTransactionCount, LA.ProcessingPriority, A.LoyaltyPoints
-        FROM LoanApplications LA
-        JOIN Applicants A ON LA.ApplicantID = A.ApplicantID
-        JOIN FinancialProfile FP ON A.ApplicantID = FP.ApplicantID
-        WHERE LA.Status = 'Pending'
-    """)
-    rows = cursor.fetchall()
+    rows, fingerprints, restored = split_unchanged(rows, version)
+    decisions = []
+    if not rows:
+        return decisions, restored
     
-    features = []
-    labels = []
+    # Rule-Based Teacher over the whole batch (columnar)
+    teacher = evaluate_applications_batch(*teacher_columns(rows))
+
+    if not use_model:
+        # Fallback Mode
+        for i, row in enumerate(rows):
+            result = teacher_result(teacher, i)
+            decisions.append((row[0], result['Status'], result['Score'], result['Amount'], result['Risk'], result['Reason'],
+                              fingerprints[i], version))
+        return decisions, restored
+
+    # Features match training preparation: row[2:]
+    features_batch = loan_features.prepare_features_batch(rows, start=2)
     
-    for row in rows:
-        app_id = row[0]
-        # Label with Rule-Based Logic - RULES DO NOT CHANGE (They generate "Ground Truth" Signal)
-        # The Rules ignore the noise, so the Label is clean.
-        # The Model receives Signal + Noise as input, and tries to predict the Clean Label.
-        # This effectively forces the Model to learn that Noise is irrelevant.
-        result = evaluate_application(row) 
-        
-        # Determine Label (1 for Approved, 0 for Rejected)
-        label = 1.0 if result['Status'] == 'Approved' else 0.0
-        
-        # Prepare Features (Includes Noise)
-        # row[1] is ReqAmount (skipped for simple eligibility model, used for logic)
-        # Features start from row[2] (Income) to end
-        # Now this includes ExistingDebt at index 4 (relative to query) / index 2 (relative to slice)
-        # Slice from row[2] gives: [Income, Score, Debt, DTI, Collateral, AcctAge, AvgTrans, Priority, Loyalty] -> 9 items. Correct.
-        feat = loan_model.prepare_features(row[2:]) 
-        features.append(feat)
-        labels.append(label)
+    # Batched Prediction (one forward pass per chunk)
+    probs = scorer.predict(features_batch, chunk_size=PREDICT_CHUNK_SIZE)
+    
+    for i, prob in enumerate(probs):
+        app_id = rows[i][0]
         
-        # Write "Ground Truth" to DB so we don't re-process them as pending forever
-        # Warning: This "uses up" the pending data to create history
-        cursor.execute("UPDATE LoanApplications SET Status = %s WHERE ApplicationID = %s", (result['Status'], app_id))
+        # Interpretation
+        status = 'Approved' if prob > 0.5 else 'Rejected'
+        risk = 'Low' if prob > 0.8 else 'Medium' if prob > 0.5 else 'High'
         
-        # FIXED: Use actual reasoning instead of static string
-        reasoning_text = f"{result['Reason']} (Bootstrapped Label)"
+        # We still need Amount logic (Model predicts eligibility, not amount yet - hybrid approach)
+        # Re-use rule logic strictly for Amount, but use Model for Status
+        amount = round(float(teacher['Amount'][i]), 2) if status == 'Approved' else 0.0
         
-        cursor.execute("""
-            INSERT INTO Predictions (ApplicationID, PredictedEligibilityScore, RecommendedLoanAmount, ModelRiskLevel, Reasoning)
-            VALUES (%s, %s, %s, %s, %s)
-        """, (app_id, result['Score'], result['Amount'], 'Bootstrap-Truth', reasoning_text))
-    
-    conn.commit()
-    print("Step 2: Training Neural Network on Bootstrapped Data...")
-    
-    # Train
-    model = loan_model.train_model(features, labels, epochs=5)
-    
-    # Save
-    torch.save(model.state_dict(), model_path)
-    print(f"Model saved to {model_path}")
-    
-    return model
+        # Update: Use status-based logic AND probability for reasoning
+        # Calculate what the rule reasoning was (e.g. Low CIBIL)
+        # And display it alongside AI Confidence
+        if status == 'Rejected':
+            # If rejected, why? Use rule checker to hint at why
+            fail_reasons = teacher_reason(teacher, i)
+            if "Eligible" in fail_reasons: 
+                fail_reasons = "Model Rejection (Risk Factors High)" # Model disagreed with simple rules
+            reasoning_text = f"{fail_reasons} (AI Confidence: {100-int(prob*100)}%)"
+        else:
+            reasoning_text = f"Meets Eligibility Criteria (AI Confidence: {int(prob*100)}%)"
+
+        decisions.append((app_id, status, float(prob), amount, risk, reasoning_text, fingerprints[i], version))
     
+    return decisions, restored
+
 def main():
     print("Starting AI Prediction Agent (Deep Neural Network Powered)...")
+    print(f"Worker ID: {WORKER_ID}")
     
     single_run = '--single-run' in sys.argv
     if single_run:
         print("Mode: Single Batch Run (GitHub Actions)")
+    
+    # LISTEN needs a session-level connection; use --poll-only behind a transaction pooler
+    use_listen = not single_run and '--poll-only' not in sys.argv
+    listener = None
 
-    # Startup Phase: Load or Train Model
-    conn = db_config.get_connection()
-    if not conn:
-        print("DB Connection failed on startup.")
+    # --backend numpy|eager|torchscript|onnx (default: INFERENCE_BACKEND or numpy, which needs no torch)
+    backend = inference_backends.DEFAULT_BACKEND
+    if '--backend' in sys.argv[:-1]:
+        backend = sys.argv[sys.argv.index('--backend') + 1]
+    if backend not in inference_backends.BACKENDS:
+        print(f"Unknown backend '{backend}'. Choose from: {', '.join(inference_backends.BACKENDS)}")
         return
-        
-    model = bootstrap_training(conn, MODEL_PATH)
-    conn.close()
+    
+    # Startup Phase: Load Model
+    # The watcher then hot-swaps newly promoted versions between pages (see model_registry.py)
+    watcher = model_registry.ModelWatcher(backend=backend)
+    load_promoted_model(watcher)
     
     while True:
-        conn = db_config.get_connection()
-        if not conn:
-            time.sleep(5); continue
+        # Subscribe before draining the queue so nothing inserted meanwhile is missed
+        if use_listen and listener is None:
+            listener = open_listener()
+        
+        with db_config.connection() as conn:
+            if not conn:
+                time.sleep(5); continue
             
-        cursor = conn.cursor()
+            cursor = conn.cursor()
         
-        try:
-            # Fetch Pending
-            # FIXED QUERY HERE TOO
-            cursor.execute("""
-                SELECT LA.ApplicationID, LA.RequestAmount, 
-                       FP.AnnualIncome, FP.CreditScore, FP.ExistingDebt, FP.DebtToIncomeRatio, FP.CollateralValue,
-                       FP.AccountAgeDays, FP.AvgTransactionCount, LA.ProcessingPriority, A.LoyaltyPoints
-                FROM LoanApplications LA
-                JOIN Applicants A ON LA.ApplicantID = A.ApplicantID
-                JOIN FinancialProfile FP ON A.ApplicantID = FP.ApplicantID
-                WHERE LA.Status = 'Pending'
-            """)
-            rows = cursor.fetchall() 
+            try:
+                # Stream Pending: claim -> featurize -> score -> write, one page at a time
+                processed = 0
+                unchanged = 0
+                for rows in iter_claimed_pages(conn, WORKER_ID, PENDING_PAGE_SIZE):
+                    # Swap in a newly promoted model before scoring; a page never mixes versions
+                    watcher.poll()
+                    scorer, version = watcher.scorer, watcher.version or RULES_VERSION
+                    decisions, restored = decide_batch(scorer, rows, version)
+                    write_decisions(cursor, decisions, WORKER_ID)
+                    restore_decisions(cursor, restored, WORKER_ID)
+                    conn.commit()
+                    processed += len(rows)
+                    unchanged += len(restored)
+                    print(f"Processed {processed} applications ({unchanged} unchanged, previous decision kept)...")
             
-            if rows:
-                print(f"Processing {len(rows)} applications...")
-                
-                # If we still don't have a model (e.g. initial count < 1000), use rule based
-                use_model = (model is not None)
-                
-                features_batch = []
-                ids_batch = []
-                rows_batch = []
-
-                for row in rows:
-                    if not use_model:
-                        # Fallback Mode
-                        result = evaluate_application(row)
-                        cursor.execute("UPDATE LoanApplications SET Status = %s WHERE ApplicationID = %s", (result['Status'], row[0]))
-                        cursor.execute("INSERT INTO Predictions (ApplicationID, PredictedEligibilityScore, RecommendedLoanAmount, ModelRiskLevel, Reasoning) VALUES (%s, %s, %s, %s, %s)", 
-                            (row[0], result['Score'], result['Amount'], result['Risk'], result['Reason']))
-                    else:
-                        # Collect for Model Prediction
-                        # Features match training preparation: row[2:]
-                        feat = loan_model.prepare_features(row[2:])
-                        features_batch.append(feat)
-                        ids_batch.append(row[0])
-                        rows_batch.append(row)
-
-                if use_model and features_batch:
-                    # Sequential Prediction
-                    for i, feat in enumerate(features_batch):
-                        app_id = ids_batch[i]
-                        orig_row = rows_batch[i]
-                        
-                        # AI Prediction
-                        prob = loan_model.predict_single(model, feat)
-                        
-                        # Interpretation
-                        status = 'Approved' if prob > 0.5 else 'Rejected'
-                        risk = 'Low' if prob > 0.8 else 'Medium' if prob > 0.5 else 'High'
-                        
-                        # We still need Amount logic (Model predicts eligibility, not amount yet - hybrid approach)
-                        # Re-use rule logic strictly for Amount, but use Model for Status
-                        rule_result = evaluate_application(orig_row)
-                        amount = rule_result['Amount'] if status == 'Approved' else 0.0
-                        
-                        # Update: Use status-based logic AND probability for reasoning
-                        # Calculate what the rule reasoning was (e.g. Low CIBIL)
-                        # And display it alongside AI Confidence
-                        
-                        reason_prefix = "AI Logic"
-                        if status == 'Rejected':
-                            # If rejected, why? Use rule checker to hint at why
-                            fail_reasons = rule_result['Reason']
-                            if "Eligible" in fail_reasons: 
-                                fail_reasons = "Model Rejection (Risk Factors High)" # Model disagreed with simple rules
-                            reasoning_text = f"{fail_reasons} (AI Confidence: {100-int(prob*100)}%)"
-                        else:
-                            reasoning_text = f"Meets Eligibility Criteria (AI Confidence: {int(prob*100)}%)"
-
-                        cursor.execute("UPDATE LoanApplications SET Status = %s WHERE ApplicationID = %s", (status, app_id))
-                        cursor.execute("""
-                            INSERT INTO Predictions (ApplicationID, PredictedEligibilityScore, RecommendedLoanAmount, ModelRiskLevel, Reasoning)
-                            VALUES (%s, %s, %s, %s, %s)
-                        """, (app_id, float(prob), amount, risk, reasoning_text))
-
-                conn.commit()
-                print("Batch processed.")
-            else:
-                if single_run:
+                if processed:
+                    compact_decision_stats(conn)
+                    print("Batch processed.")
+                else:
+                    if single_run:
+                        print("No pending applications. Existing.")
+                        break
                     print("No pending applications. Existing.")
-                    break
-                print("No pending applications. Existing.")
             
-        except Exception as e:
-            print(f"Error: {e}")
-            
-        conn.close()
+            except Exception as e:
+                print(f"Error: {e}")
         
         if single_run:
             break
             
-        time.sleep(POLL_INTERVAL)
+        listener = wait_for_work(listener, POLL_INTERVAL)
 
 if __name__ == "__main__":
     main()
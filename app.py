@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 import time
 import db_config
+import dashboard_queries
+import dashboard_cache
+import status_api
 import os
 import plotly.express as px
 import plotly.graph_objects as go
@@ -81,39 +84,22 @@ def local_css():
 
 local_css()
 
-def get_data():
-    conn = db_config.get_connection()
-    if not conn:
-        return pd.DataFrame()
-        
+# Dashboard sizes: what the page transfers no longer depends on how many applications exist
+SCATTER_SAMPLE_SIZE = 2000 # Points in the Income vs Loan Amount scatter
+PAGE_SIZES = [25, 50, 100, 250] # Rows per applications table page
+SCORE_RANGE = (300, 900) # Credit score slider bounds; the full range applies no filter
+HISTORY_HOURS = 48 # Window of the throughput / approval rate charts
+RISK_COLORS = {'Low':'#00cc96', 'Medium':'#FFA15A', 'High':'#EF553B', 'Unknown':'#B6B6B6'}
+
+STATUS_COLORS = {'Approved':'#00cc96', 'Rejected':'#EF553B', 'Pending':'#FFA15A', 'InProgress':'#AB63FA'}
+
+def get_data(query, params=None):
+    # Runs one of the dashboard_queries into a DataFrame (empty on failure).
+    # Results are shared by all viewers until a new decision arrives (see dashboard_cache.py)
     try:
-        # Postgres Syntax: LIMIT instead of TOP
-        # String concatenation: || is standard SQL (Postgres), + is T-SQL (SQL Server)
-        # CRITICAL: Postgres returns lowercase columns by default. 
-        # We must Alias them with quotes to keep them Capitalized for the DF code.
-        query = """
-        SELECT 
-            A.ApplicantID AS "ApplicantID",
-            A.FirstName || ' ' || A.LastName AS "Name",
-            A.Age AS "Age",
-            A.EmploymentStatus AS "EmploymentStatus",
-            FP.AnnualIncome AS "AnnualIncome",
-            FP.CreditScore AS "CreditScore",
-            LA.RequestAmount AS "RequestAmount",
-            LA.Status AS "Status",
-            P.RecommendedLoanAmount AS "RecommendedLoanAmount",
-            P.Reasoning AS "Reasoning",
-            LA.ApplicationID AS "ApplicationID"
-        FROM LoanApplications LA
-        JOIN Applicants A ON LA.ApplicantID = A.ApplicantID
-        JOIN FinancialProfile FP ON A.ApplicantID = FP.ApplicantID
-        LEFT JOIN Predictions P ON LA.ApplicationID = P.ApplicationID
-        ORDER BY LA.ApplicationID DESC
-        """
-        # REMOVED LIMIT 100 to show full data
-        df = pd.read_sql(query, conn)
-        conn.close()
-        return df
+        return dashboard_cache.CACHE.query(query, params)
+    except db_config.DatabaseUnavailable:
+        return pd.DataFrame()
     except Exception as e:
         st.error(f"Error fetching data: {e}")
         return pd.DataFrame()
@@ -131,13 +117,14 @@ if page == "Live Dashboard":
     st.title("🏦 Executive Dashboard")
     st.markdown("Real-time insights into loan processing and AI decisions.")
 
-    # Metrics
-    df = get_data()
-    if not df.empty:
-        total_apps = len(df)
-        approved = len(df[df['Status'] == 'Approved'])
-        rejected = len(df[df['Status'] == 'Rejected'])
-        pending = len(df[df['Status'] == 'Pending'])
+    # Metrics (counted in SQL, one row per status)
+    counts = get_data(dashboard_queries.STATUS_COUNTS_QUERY)
+    if not counts.empty:
+        by_status = dict(zip(counts['Status'], counts['Count']))
+        total_apps = int(counts['Count'].sum())
+        approved = int(by_status.get('Approved', 0))
+        rejected = int(by_status.get('Rejected', 0))
+        pending = int(by_status.get('Pending', 0) + by_status.get('InProgress', 0))
         approval_rate = (approved / total_apps * 100) if total_apps > 0 else 0
         
         # Top Metrics Row
@@ -154,22 +141,78 @@ if page == "Live Dashboard":
         
         with c1:
             # Status Distribution Pie Chart
-            fig_pie = px.pie(df, names='Status', title='Application Status Distribution', 
+            fig_pie = px.pie(counts, names='Status', values='Count', title='Application Status Distribution', 
                              color='Status',
-                             color_discrete_map={'Approved':'#00cc96', 'Rejected':'#EF553B', 'Pending':'#FFA15A'},
+                             color_discrete_map=STATUS_COLORS,
                              hole=0.4)
             st.plotly_chart(fig_pie, use_container_width=True)
             
         with c2:
-            # Income vs Loan Amount Scatter
-            fig_scatter = px.scatter(df, x="AnnualIncome", y="RequestAmount", color="Status",
-                                     title="Income vs Requested Loan Amount",
-                                     color_discrete_map={'Approved':'#00cc96', 'Rejected':'#EF553B', 'Pending':'#FFA15A'},
+            # Income vs Loan Amount Scatter (random sample of applications)
+            sample = get_data(dashboard_queries.SCATTER_SAMPLE_QUERY, (SCATTER_SAMPLE_SIZE,))
+            fig_scatter = px.scatter(sample, x="AnnualIncome", y="RequestAmount", color="Status",
+                                     title=f"Income vs Requested Loan Amount (sample of {len(sample)})",
+                                     color_discrete_map=STATUS_COLORS,
                                      log_x=True, log_y=True)
             st.plotly_chart(fig_scatter, use_container_width=True)
 
-        # Recent Data Table
+        # Charts Row 2: decisions sliced by the model version that made them
+        versions = get_data(dashboard_queries.VERSION_COUNTS_QUERY)
+        if not versions.empty:
+            fig_versions = px.bar(versions, x='ModelVersion', y='Count', color='Status', barmode='group',
+                                  title='Decisions by Model Version',
+                                  color_discrete_map=STATUS_COLORS)
+            st.plotly_chart(fig_versions, use_container_width=True)
+
+        # Charts Row 3: decisions over time, from the hourly DecisionStats rollup
+        hourly = get_data(dashboard_queries.DECISIONS_PER_HOUR_QUERY, (HISTORY_HOURS,))
+        if not hourly.empty:
+            t1, t2 = st.columns(2)
+            with t1:
+                fig_throughput = px.bar(hourly, x='Hour', y='Count', color='RiskLevel',
+                                        title=f'Decisions per Hour by Risk Level (last {HISTORY_HOURS}h)',
+                                        color_discrete_map=RISK_COLORS)
+                st.plotly_chart(fig_throughput, use_container_width=True)
+            with t2:
+                per_hour = hourly.pivot_table(index='Hour', columns='Status', values='Count', aggfunc='sum', fill_value=0)
+                rate = (per_hour.get('Approved', 0) / per_hour.sum(axis=1) * 100).rename('ApprovalRate').reset_index()
+                fig_rate = px.line(rate, x='Hour', y='ApprovalRate', markers=True,
+                                   title=f'Approval Rate per Hour (last {HISTORY_HOURS}h)',
+                                   labels={'ApprovalRate': 'Approval Rate (%)'})
+                fig_rate.update_yaxes(range=[0, 100])
+                st.plotly_chart(fig_rate, use_container_width=True)
+
+        # Applications Table: keyset pages on ApplicationID (newest first), filtered in SQL
         st.markdown("### 📋 All Applications")
+        f1, f2, f3, f4, f5 = st.columns([1, 2, 1, 1, 1])
+        status_filter = f1.selectbox("Status", ["All", "Approved", "Rejected", "Pending", "InProgress"])
+        score_range = f2.slider("Credit Score", SCORE_RANGE[0], SCORE_RANGE[1], SCORE_RANGE)
+        min_income = f3.number_input("Min Income (₹)", 0.0, 100000000.0, 0.0, step=100000.0)
+        max_income = f4.number_input("Max Income (₹, 0 = any)", 0.0, 100000000.0, 0.0, step=100000.0)
+        page_size = f5.selectbox("Rows", PAGE_SIZES, index=1)
+        filters = {
+            'status': None if status_filter == "All" else status_filter,
+            'min_score': score_range[0] if score_range[0] > SCORE_RANGE[0] else None,
+            'max_score': score_range[1] if score_range[1] < SCORE_RANGE[1] else None,
+            'min_income': min_income or None,
+            'max_income': max_income or None,
+        }
+
+        # Cursor stack: the last ApplicationID of every page before the current one.
+        # Changing a filter or the page size starts over from the newest application.
+        page_key = (tuple(filters.items()), page_size)
+        if st.session_state.get('page_key') != page_key:
+            st.session_state.page_key = page_key
+            st.session_state.page_cursors = []
+        cursors = st.session_state.page_cursors
+
+        # One extra row tells whether a next page exists
+        query, params = dashboard_queries.applications_page_query(
+            page_size + 1, before=cursors[-1] if cursors else None, **filters)
+        df = get_data(query, params)
+        has_next = len(df) > page_size
+        df = df.head(page_size)
+
         # Showing ALL columns and disabling restricted container width to allow scrolling if needed
         st.dataframe(
             df,
@@ -181,15 +224,32 @@ if page == "Live Dashboard":
                 "CreditScore": st.column_config.ProgressColumn("Credit Score", min_value=300, max_value=900, format="%d"),
                 "AnnualIncome": st.column_config.NumberColumn("Income", format="₹%d"),
                 "RecommendedLoanAmount": st.column_config.NumberColumn("Approved Amt", format="₹%d"),
+                "ModelVersion": st.column_config.TextColumn("Model Version"),
             }
         )
+
+        p1, p2, p3 = st.columns([1, 2, 1])
+        if p1.button("⬅️ Newer", disabled=not cursors):
+            cursors.pop()
+            st.rerun()
+        p2.caption(f"Page {len(cursors) + 1} · {len(df)} applications")
+        if p3.button("Older ➡️", disabled=not has_next):
+            cursors.append(int(df['ApplicationID'].iloc[-1]))
+            st.rerun()
         
     else:
         st.warning("No data found or Database Connection Failed. Please check your Secret Keys.")
 
     if st.button("🔄 Refresh Data"):
+        dashboard_cache.CACHE.expire_watermark() # Check for new decisions now
         st.rerun()
 
+    cache_stats = dashboard_cache.CACHE.stats()
+    st.caption(f"Query cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+               f"({cache_stats['hit_rate']:.0%} hit rate, {cache_stats['invalidations']} invalidated by new decisions, "
+               f"{cache_stats['expirations']} expired) · {cache_stats['entries']} cached results · "
+               f"TTL {dashboard_cache.CACHE_TTL:.0f}s")
+
 elif page == "Apply for Loan":
     st.title("📝 New Loan Application")
     st.markdown("Submit your details below for an instant AI assessment.")
@@ -232,54 +292,53 @@ elif page == "Apply for Loan":
             if not first_name or not last_name:
                 st.error("Please fill in your name.")
             else:
-                conn = db_config.get_connection()
-                if conn:
-                    try:
-                        cursor = conn.cursor()
-                        # Calculate derived fields
-                        dti = (debt / income) if income > 0 else 0
-                        total_asset = req_amount + collateral_val
-                        lc = req_amount / total_asset if total_asset > 0 else 1.0
+                with db_config.connection() as conn:
+                    if conn:
+                        try:
+                            cursor = conn.cursor()
+                            # Calculate derived fields
+                            dti = (debt / income) if income > 0 else 0
+                            total_asset = req_amount + collateral_val
+                            lc = req_amount / total_asset if total_asset > 0 else 1.0
                         
-                        # Generic noise for manual entry
-                        maiden_noise = None
-                        handle_noise = None
-                        ip = "127.0.0.1"
-                        loyalty = 0
-                        collateral_type = "None" if collateral_val == 0 else "Other"
+                            # Generic noise for manual entry
+                            maiden_noise = None
+                            handle_noise = None
+                            ip = "127.0.0.1"
+                            loyalty = 0
+                            collateral_type = "None" if collateral_val == 0 else "Other"
                         
-                        # INSERT Applicant
-                        cursor.execute("""
-                            INSERT INTO Applicants (FirstName, LastName, Age, Email, Address, PhoneNumber, MaidenName, SocialMediaHandle, LastLoginIP, LoyaltyPoints, EmploymentStatus, JobTitle, YearsExperience) 
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                            RETURNING ApplicantID
-                        """, (first_name, last_name, age, email, address, phone, maiden_noise, handle_noise, ip, loyalty, employment, job_title, exp))
+                            # INSERT Applicant
+                            cursor.execute("""
+                                INSERT INTO Applicants (FirstName, LastName, Age, Email, Address, PhoneNumber, MaidenName, SocialMediaHandle, LastLoginIP, LoyaltyPoints, EmploymentStatus, JobTitle, YearsExperience) 
+                                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                                RETURNING ApplicantID
+                            """, (first_name, last_name, age, email, address, phone, maiden_noise, handle_noise, ip, loyalty, employment, job_title, exp))
                         
-                        app_id = cursor.fetchone()[0]
+                            app_id = cursor.fetchone()[0]
                         
-                        # INSERT Financials
-                        cursor.execute("""
-                            INSERT INTO FinancialProfile (ApplicantID, AnnualIncome, CreditScore, ExistingDebt, DebtToIncomeRatio, CollateralValue, CollateralType, AccountAgeDays, AvgTransactionCount, LastBranchVisited)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        """, (app_id, income, credit_score, debt, dti, collateral_val, collateral_type, 365, 10, 'Online'))
+                            # INSERT Financials
+                            cursor.execute("""
+                                INSERT INTO FinancialProfile (ApplicantID, AnnualIncome, CreditScore, ExistingDebt, DebtToIncomeRatio, CollateralValue, CollateralType, AccountAgeDays, AvgTransactionCount, LastBranchVisited)
+                                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                            """, (app_id, income, credit_score, debt, dti, collateral_val, collateral_type, 365, 10, 'Online'))
                         
-                        # INSERT LoanRequest
-                        cursor.execute("""
-                            INSERT INTO LoanApplications (ApplicantID, RequestAmount, LoanPurpose, LoanToCostRatio, ApplicationSource, ReferralCode, ProcessingPriority)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s)
-                        """, (app_id, req_amount, 'Personal', lc, 'Web Form', None, 5))
+                            # INSERT LoanRequest
+                            cursor.execute("""
+                                INSERT INTO LoanApplications (ApplicantID, RequestAmount, LoanPurpose, LoanToCostRatio, ApplicationSource, ReferralCode, ProcessingPriority)
+                                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                            """, (app_id, req_amount, 'Personal', lc, 'Web Form', None, 5))
                         
-                        conn.commit()
-                        conn.close()
+                            conn.commit()
                         
-                        st.balloons()
-                        st.success(f"Application Submitted Successfully! Reference ID: {app_id}")
-                        st.info("The AI Agent is evaluating your profile now. Check the 'Check Status' page in a few seconds.")
+                            st.balloons()
+                            st.success(f"Application Submitted Successfully! Reference ID: {app_id}")
+                            st.info("The AI Agent is evaluating your profile now. Check the 'Check Status' page in a few seconds.")
                         
-                    except Exception as e:
-                        st.error(f"Database Error: {e}")
-                else:
-                    st.error("Could not connect to database.")
+                        except Exception as e:
+                            st.error(f"Database Error: {e}")
+                    else:
+                        st.error("Could not connect to database.")
 
 elif page == "Check Status":
     st.title("🔍 Track Application")
@@ -290,109 +349,87 @@ elif page == "Check Status":
         check_btn = st.button("Check Status")
     
     if check_btn:
-        conn = db_config.get_connection()
-        if conn:
-            try:
-                query = """
-                SELECT 
-                    LA.ApplicationID,
-                    LA.Status,
-                    LA.RequestAmount,
-                    P.PredictedEligibilityScore,
-                    P.ModelRiskLevel,
-                    P.Reasoning,
-                    P.RecommendedLoanAmount,
-                    A.FirstName || ' ' || A.LastName AS Name,
-                    A.EmploymentStatus,
-                    FP.AnnualIncome,
-                    FP.CreditScore,
-                    FP.DebtToIncomeRatio
-                FROM LoanApplications LA
-                JOIN Applicants A ON LA.ApplicantID = A.ApplicantID
-                JOIN FinancialProfile FP ON A.ApplicantID = FP.ApplicantID
-                LEFT JOIN Predictions P ON LA.ApplicationID = P.ApplicationID
-                WHERE LA.ApplicationID = %s
-                """
-                cursor = conn.cursor()
-                cursor.execute(query, (app_id_input,))
-                row = cursor.fetchone()
+        try:
+            # Latest prediction only (see status_api.py / LatestPredictions)
+            row = status_api.lookup_status(app_id_input)
+            
+            if row:
+                status = row['Status']
+                req_amount = row['RequestAmount']
+                score = row['Score'] if row['Score'] is not None else 0.0
+                risk = row['RiskLevel'] if row['RiskLevel'] is not None else "Pending"
+                reasoning = row['Reasoning'] if row['Reasoning'] is not None else "AI Analysis in progress..."
+                rec_amount = row['RecommendedLoanAmount']
+            
+                name = row['Name']
+                emp_status = row['EmploymentStatus']
+                income = row['AnnualIncome']
+                cibil = row['CreditScore']
+                dti = row['DebtToIncomeRatio']
+
+                # Determine styling class
+                card_class = "pending"
+                if status == "Approved": card_class = "approved"
+                elif status == "Rejected": card_class = "rejected"
+            
+                st.markdown(f"""
+                <div class="result-card {card_class}">
+                    <h2>Application #{row['ApplicationID']}</h2>
+                    <h1>{status.upper()}</h1>
+                    <p>Applicant: {name}</p>
+                </div>
+                """, unsafe_allow_html=True)
+            
+                # Columns for details
+                d1, d2 = st.columns(2)
+            
+                with d1:
+                    st.markdown("### 📊 Financial Context")
+                    st.write(f"**Credit Score:** {cibil}")
+                    st.write(f"**Annual Income:** ₹{income:,.0f}")
+                    st.write(f"**Debt-to-Income:** {dti*100:.1f}%")
                 
-                if row:
-                    status = row[1]
-                    req_amount = row[2]
-                    score = row[3] if row[3] is not None else 0.0
-                    risk = row[4] if row[4] is not None else "Pending"
-                    reasoning = row[5] if row[5] is not None else "AI Analysis in progress..."
-                    rec_amount = row[6]
-                    
-                    name = row[7]
-                    emp_status = row[8]
-                    income = row[9]
-                    cibil = row[10]
-                    dti = row[11]
-                    
-                    # Determine styling class
-                    card_class = "pending"
-                    if status == "Approved": card_class = "approved"
-                    elif status == "Rejected": card_class = "rejected"
-                    
-                    st.markdown(f"""
-                    <div class="result-card {card_class}">
-                        <h2>Application #{row[0]}</h2>
-                        <h1>{status.upper()}</h1>
-                        <p>Applicant: {name}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    # Columns for details
-                    d1, d2 = st.columns(2)
-                    
-                    with d1:
-                        st.markdown("### 📊 Financial Context")
-                        st.write(f"**Credit Score:** {cibil}")
-                        st.write(f"**Annual Income:** ₹{income:,.0f}")
-                        st.write(f"**Debt-to-Income:** {dti*100:.1f}%")
-                        
-                    with d2:
-                        st.markdown("### 💰 Offer Details")
-                        st.write(f"**Requested:** ₹{req_amount:,.2f}")
-                        if rec_amount:
-                            st.write(f"**Approved:** ₹{rec_amount:,.2f}")
-                        else:
-                            st.write("**Approved:** ₹0.00")
+                with d2:
+                    st.markdown("### 💰 Offer Details")
+                    st.write(f"**Requested:** ₹{req_amount:,.2f}")
+                    if rec_amount:
+                        st.write(f"**Approved:** ₹{rec_amount:,.2f}")
+                    else:
+                        st.write("**Approved:** ₹0.00")
 
-                    st.markdown("---")
-                    st.markdown("### 🤖 AI Agent Analysis")
-                    
-                    # Gauge chart for score
-                    fig = go.Figure(go.Indicator(
-                        mode = "gauge+number",
-                        value = score * 100,
-                        domain = {'x': [0, 1], 'y': [0, 1]},
-                        title = {'text': "Eligibility Score"},
-                        gauge = {
-                            'axis': {'range': [0, 100]},
-                            'bar': {'color': "#1E88E5"},
-                            'steps': [
-                                {'range': [0, 50], 'color': "#ffe0e0"},
-                                {'range': [50, 80], 'color': "#fff5cc"},
-                                {'range': [80, 100], 'color': "#e0ffe0"}],
-                        }
-                    ))
-                    # Increased height and margins to prevent clipping
-                    fig.update_layout(height=400, margin=dict(l=30, r=30, t=50, b=50))
-                    st.plotly_chart(fig, use_container_width=True)
-                    
-                    with st.expander("📝 View Detailed Agent Reasoning", expanded=True):
-                        st.write(reasoning)
-                        if status == "Rejected":
-                            st.warning("Tip: Improve your credit score or reduce existing debt to increase approval chances.")
+                st.markdown("---")
+                st.markdown("### 🤖 AI Agent Analysis")
+            
+                # Gauge chart for score
+                fig = go.Figure(go.Indicator(
+                    mode = "gauge+number",
+                    value = score * 100,
+                    domain = {'x': [0, 1], 'y': [0, 1]},
+                    title = {'text': "Eligibility Score"},
+                    gauge = {
+                        'axis': {'range': [0, 100]},
+                        'bar': {'color': "#1E88E5"},
+                        'steps': [
+                            {'range': [0, 50], 'color': "#ffe0e0"},
+                            {'range': [50, 80], 'color': "#fff5cc"},
+                            {'range': [80, 100], 'color': "#e0ffe0"}],
+                    }
+                ))
+                # Increased height and margins to prevent clipping
+                fig.update_layout(height=400, margin=dict(l=30, r=30, t=50, b=50))
+                st.plotly_chart(fig, use_container_width=True)
+            
+                with st.expander("📝 View Detailed Agent Reasoning", expanded=True):
+                    st.write(reasoning)
+                    if row['ModelVersion']:
+                        st.caption(f"Model version: {row['ModelVersion']} · decided {row['DecidedAt']:%Y-%m-%d %H:%M}")
+                    if status == "Rejected":
+                        st.warning("Tip: Improve your credit score or reduce existing debt to increase approval chances.")
 
-                else:
-                    st.error("Application ID not found.")
-                
-                conn.close()
-            except Exception as e:
-                st.error(f"Error: {e}")
-        else:
+            else:
+                st.error("Application ID not found.")
+        
+        except db_config.DatabaseUnavailable:
             st.error("Database connection failed.")
+        except Exception as e:
+            st.error(f"Error: {e}")
@@ -0,0 +1,127 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import torch
+import loan_model
+import model_registry
+import inference_backends
+
+# Inference Backend Benchmark
+# Scores the same synthetic feature matrix with every backend and reports:
+#   per-row   median latency of single-row calls (the 1-application page case)
+#   per-batch rows/second at several batch sizes (the claim-page case)
+#   max diff  largest |probability - eager probability|, so a fast backend is also a correct one
+#   startup   optional cold start in a fresh interpreter: import + load + first prediction
+# Usage: python benchmark_inference.py [--version V | --random] [--backends eager,onnx] [--cold-start]
+BATCH_SIZES = [1, 64, 4096, 65536]
+ROW_CALLS = 2000 # Single-row calls timed per backend
+MIN_BATCH_SECONDS = 0.5 # Each batch size is repeated until at least this much time has passed
+
+def synthetic_features(n, seed=0):
+    # Normalized features in the ranges prepare_features_batch produces (Credit Score is uncapped, ~0.33-0.94)
+    rng = np.random.default_rng(seed)
+    features = rng.random((n, len(loan_model.FEATURE_COLUMNS)), dtype=np.float32)
+    features[:, 1] = rng.uniform(300 / 900, 850 / 900, n)
+    return features
+
+def benchmark_rows(scorer, features, calls=ROW_CALLS):
+    timings = []
+    for i in range(calls):
+        row = features[i % len(features)][None, :]
+        started = time.perf_counter()
+        scorer.predict(row)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+def benchmark_batch(scorer, features, batch_size):
+    # Rows per second, scoring the batch with chunk_size == batch_size (one backend call per batch)
+    batch = features[:batch_size]
+    scorer.predict(batch, chunk_size=batch_size) # Warm-up
+    rows = 0
+    started = time.perf_counter()
+    while True:
+        scorer.predict(batch, chunk_size=batch_size)
+        rows += len(batch)
+        elapsed = time.perf_counter() - started
+        if elapsed >= MIN_BATCH_SECONDS:
+            return rows / elapsed
+
+def cold_start(backend, version_dir):
+    # Seconds for a fresh interpreter to import the backend, load the artifact and score one row
+    code = (
+        "import time; started = time.perf_counter()\n"
+        "import numpy as np, inference_backends\n"
+        f"scorer = inference_backends.load_backend({backend!r}, {version_dir!r})\n"
+        "scorer.predict(np.zeros((1, 9), dtype=np.float32))\n"
+        "print(time.perf_counter() - started)\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed')
+    return float(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-row and per-batch latency across inference backends.")
+    parser.add_argument('--version', default=None, help="Registry version (default: the promoted one)")
+    parser.add_argument('--random', action='store_true', help="Benchmark a randomly initialized LoanNet instead")
+    parser.add_argument('--backends', default=','.join(inference_backends.BACKENDS))
+    parser.add_argument('--rows', type=int, default=max(BATCH_SIZES), help="Size of the synthetic feature matrix")
+    parser.add_argument('--threads', type=int, default=1, help="torch intra-op threads (the predictor's default is 1 core)")
+    parser.add_argument('--cold-start', action='store_true', help="Also time a fresh-process start per backend")
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    # Exports land in the version directory; a random model gets a throwaway one
+    if args.random:
+        torch.manual_seed(0)
+        model = loan_model.LoanNet().eval()
+        version_dir = tempfile.mkdtemp(prefix='loannet-bench-')
+        torch.save(model.state_dict(), os.path.join(version_dir, model_registry.WEIGHTS_FILE))
+        label = 'random LoanNet'
+    else:
+        version = args.version or model_registry.promoted_version()
+        if version is None:
+            print("No promoted model. Train one (python retrain_agent.py --once) or pass --random.")
+            sys.exit(1)
+        model = model_registry.load_model(version)[0]
+        version_dir = model_registry.version_dir(version)
+        label = f"model {version}"
+
+    features = synthetic_features(args.rows)
+    reference = None
+    print(f"Benchmarking {label} on {args.rows} rows ({args.threads} torch thread(s))\n")
+    print(f"{'backend':<12} {'per-row':>10} " + ' '.join(f"{f'batch {b}':>13}" for b in BATCH_SIZES) +
+          f" {'max diff':>10}" + (f" {'startup':>9}" if args.cold_start else ''))
+
+    for name in args.backends.split(','):
+        name = name.strip()
+        try:
+            scorer = inference_backends.load_backend(name, version_dir, model)
+        except Exception as e:
+            print(f"{name:<12} unavailable: {e}")
+            continue
+
+        probs = np.asarray(scorer.predict(features), dtype=np.float64)
+        if reference is None:
+            reference = np.asarray(inference_backends.EagerBackend(model).predict(features), dtype=np.float64)
+        max_diff = float(np.max(np.abs(probs - reference))) if len(probs) else 0.0
+
+        per_row = benchmark_rows(scorer, features)
+        throughput = [benchmark_batch(scorer, features, b) for b in BATCH_SIZES if b <= len(features)]
+        line = f"{name:<12} {per_row * 1e6:>8.1f}us " + ' '.join(f"{rate:>9.0f} r/s" for rate in throughput)
+        line += f" {max_diff:>10.2e}"
+        if args.cold_start:
+            try:
+                line += f" {cold_start(name, version_dir):>8.2f}s"
+            except Exception as e:
+                line += f"  failed: {e}"
+        print(line)
+
+if __name__ == '__main__':
+    main()
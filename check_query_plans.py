@@ -0,0 +1,99 @@
+import argparse
+import sys
+import db_config
+import dashboard_queries
+import dashboard_cache
+import agent_predictor
+import generate_data
+from psycopg2 import sql
+
+# Below this size a Seq Scan / hash join can legitimately beat index lookups
+DEFAULT_MIN_ROWS = 100000
+
+def hot_queries(cursor):
+    # (Name, SQL, Params, Tables allowed to be scanned in full)
+    decision_row = cursor.mogrify("(%s, %s, %s, %s, %s, %s, %s, %s)",
+                                  (1, 'Approved', 0.5, 100000.0, 'Low', 'plan check', 'fp', 'rules')).decode()
+    write_query = sql.SQL(agent_predictor.WRITE_DECISIONS_QUERY).format(worker=sql.Literal('plan-check')).as_string(cursor)
+    restore_query = sql.SQL(agent_predictor.RESTORE_DECISIONS_QUERY).format(worker=sql.Literal('plan-check')).as_string(cursor)
+    financial_row = cursor.mogrify(generate_data.FINANCIAL_UPDATE_TEMPLATE,
+                                   (1, 500000.0, 700, 1000.0, 0.1, 0.0, 'None', 100, 10, 'Plan Branch')).decode()
+    loan_row = cursor.mogrify(generate_data.LOAN_UPDATE_TEMPLATE, (1, 100000.0, 0.5)).decode()
+    return [
+        ("predictor: reclaim expired leases", agent_predictor.RECLAIM_QUERY, None, ()),
+        ("predictor: claim page", agent_predictor.CLAIM_QUERY,
+         {'worker': 'plan-check', 'lease': agent_predictor.LEASE_SECONDS, 'limit': agent_predictor.PENDING_PAGE_SIZE}, ()),
+        ("predictor: write decisions", write_query.replace('%s', decision_row), None, ()),
+        ("predictor: restore unchanged decisions", restore_query.replace('%s', "(1, 'Approved')"), None, ()),
+        ("predictor: compact dashboard rollups", agent_predictor.COMPACT_STATS_QUERY, None, ()),
+        ("dashboard: status counts", dashboard_queries.STATUS_COUNTS_QUERY, None, ()),
+        ("dashboard: decisions by model version", dashboard_queries.VERSION_COUNTS_QUERY, None, ()),
+        ("dashboard: decisions per hour", dashboard_queries.DECISIONS_PER_HOUR_QUERY, (48,), ()),
+        ("dashboard: scatter sample", dashboard_queries.SCATTER_SAMPLE_QUERY, (2000,), ()),
+        ("dashboard: applications page", *dashboard_queries.applications_page_query(51), ()),
+        ("dashboard: applications page (next, filtered)",
+         *dashboard_queries.applications_page_query(51, before=1000000, status='Rejected', min_score=600,
+                                                    max_score=750, min_income=300000.0, max_income=2000000.0), ()),
+        ("dashboard: cache watermark", dashboard_cache.WATERMARK_QUERY, None, ()),
+        ("dashboard: status lookup", dashboard_queries.STATUS_QUERY, (1,), ()),
+        ("simulator: sample applicants", generate_data.SAMPLE_APPLICANTS_QUERY, (list(range(1, 11)),), ()),
+        ("simulator: update financials", generate_data.FINANCIAL_UPDATE_QUERY.replace('%s', financial_row), None, ()),
+        ("simulator: reset loans", generate_data.LOAN_RESET_QUERY.replace('%s', loan_row), None, ()),
+    ]
+
+def walk(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from walk(child)
+
+def seq_scans(cursor, query, params):
+    cursor.execute("EXPLAIN (FORMAT JSON) " + query, params)
+    plan = cursor.fetchone()[0][0]['Plan']
+    return [node['Relation Name'] for node in walk(plan) if node['Node Type'] == 'Seq Scan']
+
+def table_sizes(cursor):
+    cursor.execute("""
+        SELECT relname, reltuples::BIGINT FROM pg_class
+        WHERE relname IN ('applicants', 'financialprofile', 'loanapplications', 'predictions')
+    """)
+    return dict(cursor.fetchall())
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN the hot queries and fail on sequential scans of large tables.")
+    parser.add_argument('--populate', type=int, default=0, help="Generate this many applicants before checking")
+    parser.add_argument('--min-rows', type=int, default=DEFAULT_MIN_ROWS, help="Ignore Seq Scans on tables smaller than this")
+    args = parser.parse_args()
+
+    with db_config.connection() as conn:
+        if not conn:
+            print("[FAIL] Database connection failed. Set DATABASE_URL to a local Postgres (add ?sslmode=disable without TLS).")
+            sys.exit(1)
+
+        if args.populate:
+            generate_data.generate_bulk_data(conn, args.populate)
+
+        # Fresh statistics (committed: ANALYZE inside a rolled-back transaction is discarded)
+        cursor = conn.cursor()
+        cursor.execute("ANALYZE")
+        conn.commit()
+        sizes = table_sizes(cursor)
+        print("Table sizes: " + ", ".join(f"{name}={rows}" for name, rows in sorted(sizes.items())))
+
+        failures = 0
+        for name, query, params, allowed in hot_queries(cursor):
+            large = [t for t in seq_scans(cursor, query, params)
+                     if sizes.get(t, 0) >= args.min_rows and t not in allowed]
+            if large:
+                failures += 1
+                print(f"[FAIL] {name}: Seq Scan on {', '.join(large)}")
+            else:
+                print(f"[OK] {name}")
+        conn.rollback()
+
+    if failures:
+        print(f"\n{failures} hot query plan(s) regressed to a sequential scan.")
+        sys.exit(1)
+    print("\nAll hot query plans use indexes.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+import pandas as pd
+import db_config
+
+# Shared Cache for Dashboard Queries
+# Streamlit re-runs app.py for every widget interaction of every viewer, but keeps imported modules,
+# so this module-level cache is shared by all sessions of the process (like the db_config pool).
+# An entry is served while
+#   1. it is younger than CACHE_TTL, and
+#   2. the decision watermark is unchanged: the newest PredictionID and ApplicationID, read with two
+#      primary key lookups at most every WATERMARK_INTERVAL seconds for all viewers together.
+# A new decision or application therefore invalidates everything on the next check; the TTL bounds
+# staleness for changes that move neither ID (e.g. a life event resetting an application to Pending).
+# Cached DataFrames are shared between sessions: treat them as read-only.
+CACHE_TTL = float(os.environ.get('DASHBOARD_CACHE_TTL', 60)) # Seconds
+WATERMARK_INTERVAL = float(os.environ.get('DASHBOARD_WATERMARK_INTERVAL', 2)) # Seconds between watermark checks
+MAX_ENTRIES = 256 # Filter / page combinations kept; the oldest entries are dropped first
+
+WATERMARK_QUERY = """
+SELECT (SELECT MAX(PredictionID) FROM Predictions),
+       (SELECT MAX(ApplicationID) FROM LoanApplications)
+"""
+
+class QueryCache:
+    def __init__(self, ttl=CACHE_TTL, watermark_interval=WATERMARK_INTERVAL, max_entries=MAX_ENTRIES):
+        self.ttl = ttl
+        self.watermark_interval = watermark_interval
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._entries = {} # key -> (watermark, stored_at, DataFrame)
+        self._watermark = None
+        self._watermark_checked = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0 # Misses caused by a newer watermark
+        self.expirations = 0 # Misses caused by the TTL
+
+    def watermark(self):
+        # The shared watermark, re-read once the check interval has passed
+        with self._lock:
+            if self._watermark is not None and time.monotonic() - self._watermark_checked < self.watermark_interval:
+                return self._watermark
+        with db_config.connection() as conn:
+            if not conn:
+                raise db_config.DatabaseUnavailable("Database unavailable")
+            cursor = conn.cursor()
+            cursor.execute(WATERMARK_QUERY)
+            watermark = tuple(cursor.fetchone())
+        with self._lock:
+            self._watermark = watermark
+            self._watermark_checked = time.monotonic()
+        return watermark
+
+    def expire_watermark(self):
+        # Next lookup re-reads the watermark (the dashboard's Refresh button)
+        with self._lock:
+            self._watermark_checked = 0
+
+    def _fresh(self, entry, watermark):
+        return entry is not None and entry[0] == watermark and time.monotonic() - entry[1] < self.ttl
+
+    def query(self, query, params=None):
+        # DataFrame for a dashboard query, loaded at most once per key and watermark across sessions
+        key = (query, repr(params))
+        watermark = self.watermark()
+        with self._lock:
+            entry = self._entries.get(key)
+            if self._fresh(entry, watermark):
+                self.hits += 1
+                return entry[2]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # One loader per key: concurrent viewers missing on the same query wait for its result
+        with key_lock:
+            with self._lock:
+                current = self._entries.get(key)
+                if current is not entry and self._fresh(current, watermark):
+                    self.hits += 1
+                    return current[2]
+            with db_config.connection() as conn:
+                if not conn:
+                    raise db_config.DatabaseUnavailable("Database unavailable")
+                df = pd.read_sql(query, conn, params=params)
+            with self._lock:
+                self.misses += 1
+                if entry is not None:
+                    if entry[0] != watermark:
+                        self.invalidations += 1
+                    else:
+                        self.expirations += 1
+                self._entries.pop(key, None) # Re-insert at the end: dict order doubles as age order
+                self._entries[key] = (watermark, time.monotonic(), df)
+                while len(self._entries) > self.max_entries:
+                    oldest = next(iter(self._entries))
+                    del self._entries[oldest]
+                    self._key_locks.pop(oldest, None)
+        return df
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'watermark': self._watermark,
+            }
+
+CACHE = QueryCache()
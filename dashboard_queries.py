@@ -0,0 +1,131 @@
+# SQL used by the Streamlit dashboard (app.py).
+# Kept in one place so check_query_plans.py can EXPLAIN exactly what the UI runs.
+
+# Live Dashboard
+# Everything the dashboard renders is computed or bounded in SQL, so render time and transfer size
+# stay flat as the tables grow (the page used to pull every application into pandas).
+# CRITICAL: Postgres returns lowercase columns by default. 
+# We must Alias them with quotes to keep them Capitalized for the DF code.
+
+# Headline metrics and the status pie: one row per status, read from the trigger-maintained
+# ApplicationStatusCounts rollup (a few delta rows per status, see setup_postgres.sql)
+STATUS_COUNTS_QUERY = """
+SELECT Status AS "Status", SUM(Applications) AS "Count"
+FROM ApplicationStatusCounts
+GROUP BY Status
+HAVING SUM(Applications) <> 0
+"""
+
+# Decisions by Model Version, from the DecisionStats rollup
+# (pre-registry predictions have no ModelVersion and are left out, as before)
+VERSION_COUNTS_QUERY = """
+SELECT ModelVersion AS "ModelVersion", Decision AS "Status", SUM(Decisions) AS "Count"
+FROM DecisionStats
+WHERE ModelVersion <> 'Unknown'
+GROUP BY ModelVersion, Decision
+ORDER BY ModelVersion
+"""
+
+# Throughput and approval rate per hour over the last N hours (parameter: hours), from DecisionStats
+DECISIONS_PER_HOUR_QUERY = """
+SELECT BucketHour AS "Hour", Decision AS "Status", RiskLevel AS "RiskLevel", SUM(Decisions) AS "Count"
+FROM DecisionStats
+WHERE BucketHour >= date_trunc('hour', NOW()::TIMESTAMP) - make_interval(hours => %s)
+GROUP BY BucketHour, Decision, RiskLevel
+ORDER BY BucketHour
+"""
+
+# Income vs Requested Amount scatter: a random sample of applications (parameter: sample size).
+# Random IDs up to MAX(ApplicationID) are looked up through the primary key, like the simulator's
+# applicant sampling; IDs drawn twice or falling in gaps just make the sample a little smaller.
+SCATTER_SAMPLE_QUERY = """
+SELECT 
+    FP.AnnualIncome AS "AnnualIncome",
+    LA.RequestAmount AS "RequestAmount",
+    LA.Status AS "Status"
+FROM LoanApplications LA
+JOIN FinancialProfile FP ON LA.ApplicantID = FP.ApplicantID
+WHERE LA.ApplicationID = ANY(ARRAY(
+    SELECT (1 + floor(random() * (SELECT MAX(ApplicationID) FROM LoanApplications)))::INT
+    FROM generate_series(1, %s)
+))
+"""
+
+# Applications table: one keyset page, newest first (see applications_page_query).
+# {filters} is filled with fixed clauses from PAGE_FILTERS only, never with user text; values are parameters.
+# The latest prediction comes from a LATERAL lookup, so re-evaluated applications appear once and
+# the ApplicationID cursor never splits an application across pages.
+# Postgres Syntax: LIMIT instead of TOP
+# String concatenation: || is standard SQL (Postgres), + is T-SQL (SQL Server)
+APPLICATIONS_PAGE_QUERY = """
+SELECT 
+    A.ApplicantID AS "ApplicantID",
+    A.FirstName || ' ' || A.LastName AS "Name",
+    A.Age AS "Age",
+    A.EmploymentStatus AS "EmploymentStatus",
+    FP.AnnualIncome AS "AnnualIncome",
+    FP.CreditScore AS "CreditScore",
+    LA.RequestAmount AS "RequestAmount",
+    LA.Status AS "Status",
+    P.RecommendedLoanAmount AS "RecommendedLoanAmount",
+    P.ModelVersion AS "ModelVersion",
+    LA.ApplicationID AS "ApplicationID"
+FROM LoanApplications LA
+JOIN Applicants A ON LA.ApplicantID = A.ApplicantID
+JOIN FinancialProfile FP ON A.ApplicantID = FP.ApplicantID
+LEFT JOIN LATERAL (
+    SELECT RecommendedLoanAmount, ModelVersion FROM Predictions
+    WHERE ApplicationID = LA.ApplicationID
+    ORDER BY PredictionID DESC LIMIT 1
+) P ON TRUE
+WHERE TRUE{filters}
+ORDER BY LA.ApplicationID DESC
+LIMIT %(limit)s
+"""
+
+# Keyset cursor and server-side filters: (parameter, clause)
+PAGE_FILTERS = [
+    ('before', "LA.ApplicationID < %(before)s"), # Last ApplicationID of the previous page
+    ('status', "LA.Status = %(status)s"), # Walks idx_loanapplications_status_id
+    ('min_score', "FP.CreditScore >= %(min_score)s"),
+    ('max_score', "FP.CreditScore <= %(max_score)s"),
+    ('min_income', "FP.AnnualIncome >= %(min_income)s"),
+    ('max_income', "FP.AnnualIncome <= %(max_income)s"),
+]
+
+def applications_page_query(limit, **filters):
+    # Returns (query, params) for one page. Filters left as None are not applied, so each
+    # combination gets a plan of its own instead of a catch-all "x IS NULL OR ..." predicate.
+    params = {'limit': limit}
+    clauses = ""
+    for name, clause in PAGE_FILTERS:
+        if filters.get(name) is not None:
+            params[name] = filters[name]
+            clauses += "\n  AND " + clause
+    return APPLICATIONS_PAGE_QUERY.replace('{filters}', clauses), params
+
+# Single application for the Check Status page and status_api.py (parameter: ApplicationID)
+# Joins the LatestPredictions view: a re-evaluated application shows its current decision,
+# not whichever of its predictions the join happened to return.
+STATUS_QUERY = """
+SELECT 
+    LA.ApplicationID AS "ApplicationID",
+    LA.Status AS "Status",
+    LA.RequestAmount AS "RequestAmount",
+    P.PredictedEligibilityScore AS "Score",
+    P.ModelRiskLevel AS "RiskLevel",
+    P.Reasoning AS "Reasoning",
+    P.RecommendedLoanAmount AS "RecommendedLoanAmount",
+    A.FirstName || ' ' || A.LastName AS "Name",
+    A.EmploymentStatus AS "EmploymentStatus",
+    FP.AnnualIncome AS "AnnualIncome",
+    FP.CreditScore AS "CreditScore",
+    FP.DebtToIncomeRatio AS "DebtToIncomeRatio",
+    P.ModelVersion AS "ModelVersion",
+    P.GeneratedAt AS "DecidedAt"
+FROM LoanApplications LA
+JOIN Applicants A ON LA.ApplicantID = A.ApplicantID
+JOIN FinancialProfile FP ON A.ApplicantID = FP.ApplicantID
+LEFT JOIN LatestPredictions P ON LA.ApplicationID = P.ApplicationID
+WHERE LA.ApplicationID = %s
+"""
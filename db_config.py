@@ -1,6 +1,28 @@
 import os
 import psycopg2
 import sys
+import threading
+import time
+from contextlib import contextmanager
+from psycopg2 import pool
+from psycopg2.extensions import parse_dsn
+
+# Connection Pool Configuration
+POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN', 1))
+POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX', 5))
+DB_SSLMODE = os.environ.get('DB_SSLMODE') # Overrides the URL's sslmode (e.g. 'disable' for a local Postgres)
+CONNECT_RETRIES = 3
+CONNECT_BACKOFF = 0.5 # Seconds, doubled after every failed attempt
+HEALTH_CHECK_IDLE = 30 # Ping connections that sat idle in the pool longer than this (seconds)
+CHECKOUT_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30)) # Seconds to wait for a free pooled connection
+
+# One pool per process. Streamlit re-runs app.py but keeps imported modules,
+# so the dashboard shares this pool across reruns and sessions.
+_pool = None
+# ThreadedConnectionPool.getconn() raises PoolError at once when all DB_POOL_MAX connections are
+# checked out. One slot per connection makes callers queue for a free one instead.
+_slots = None
+_last_used = {}
 
 def get_database_url():
     # 1. Try Environment Variable (GitHub Actions)
@@ -19,11 +41,117 @@ def get_database_url():
         
     return None
 
+def ssl_options(url):
+    # Hosted databases (Supabase) need TLS, so sslmode defaults to 'require'.
+    # An sslmode in the URL (?sslmode=disable) or DB_SSLMODE wins over that default.
+    if DB_SSLMODE:
+        return {'sslmode': DB_SSLMODE}
+    try:
+        if 'sslmode' in parse_dsn(url):
+            return {}
+    except Exception:
+        pass # Malformed URL: let connect() report it
+    return {'sslmode': 'require'}
+
 def get_connection():
+    # Dedicated (unpooled) connection, e.g. for LISTEN. Prefer connection() for queries.
     url = get_database_url()
     if not url:
         return None
     try:
-        return psycopg2.connect(url, sslmode='require')
+        return psycopg2.connect(url, **ssl_options(url))
     except Exception as e:
         return None
+
+def create_pool(minconn=POOL_MIN_SIZE, maxconn=POOL_MAX_SIZE):
+    url = get_database_url()
+    if not url:
+        return None
+    for attempt in range(CONNECT_RETRIES):
+        try:
+            return pool.ThreadedConnectionPool(minconn, maxconn, url, **ssl_options(url))
+        except Exception as e:
+            print(f"DB pool connect attempt {attempt+1}/{CONNECT_RETRIES} failed: {e}")
+            time.sleep(CONNECT_BACKOFF * 2 ** attempt)
+    return None
+
+def get_pool():
+    global _pool, _slots
+    if _pool is None or _pool.closed:
+        _pool = create_pool()
+        _slots = threading.BoundedSemaphore(_pool.maxconn) if _pool else None
+    return _pool
+
+def _is_healthy(conn):
+    if conn.closed:
+        return False
+    # Skip the round trip for freshly opened or recently used connections
+    last_used = _last_used.get(id(conn))
+    if last_used is None or time.time() - last_used < HEALTH_CHECK_IDLE:
+        return True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except Exception:
+        return False
+
+def _checkout(db_pool):
+    # Reconnect with backoff: broken connections are discarded and the pool opens fresh ones.
+    # Callers hold a slot, so getconn() only fails here on real connect errors, not on exhaustion.
+    for attempt in range(CONNECT_RETRIES):
+        try:
+            conn = db_pool.getconn()
+        except Exception as e:
+            print(f"DB checkout attempt {attempt+1}/{CONNECT_RETRIES} failed: {e}")
+            time.sleep(CONNECT_BACKOFF * 2 ** attempt)
+            continue
+        if _is_healthy(conn):
+            return conn
+        _last_used.pop(id(conn), None)
+        db_pool.putconn(conn, close=True)
+    return None
+
+class DatabaseUnavailable(Exception):
+    # Raised by callers that need rows when connection() yielded None
+    pass
+
+@contextmanager
+def connection():
+    # Checks out a pooled connection for the duration of the block.
+    # Yields None when the database is not configured or unreachable.
+    # Uncommitted work is rolled back when the connection goes back to the pool.
+    db_pool = get_pool()
+    if not db_pool:
+        yield None
+        return
+    slots = _slots
+    if not slots.acquire(timeout=CHECKOUT_TIMEOUT):
+        print(f"DB pool exhausted: no free connection within {CHECKOUT_TIMEOUT}s (DB_POOL_MAX={db_pool.maxconn})")
+        yield None
+        return
+    conn = _checkout(db_pool)
+    if conn is None:
+        slots.release()
+        yield None
+        return
+    
+    try:
+        yield conn
+    finally:
+        broken = bool(conn.closed)
+        if not broken:
+            try:
+                conn.rollback()
+                conn.autocommit = False
+            except Exception:
+                broken = True
+        if broken:
+            _last_used.pop(id(conn), None)
+        else:
+            _last_used[id(conn)] = time.time()
+        try:
+            db_pool.putconn(conn, close=broken)
+        finally:
+            slots.release()
@@ -0,0 +1,280 @@
+import json
+import os
+import shutil
+import sys
+import numpy as np
+import db_config
+import loan_model
+import model_registry
+import agent_predictor
+
+# Local Columnar Feature Store
+# Decided applications, joined and normalized once, kept as memory-mappable .npy shards so training
+# and offline evaluation read them without touching the production DB.
+# <FEATURE_STORE_DIR>/
+#     manifest.json                        schema, PredictionID watermark and gaps, shard list (swapped atomically)
+#     shard-<gen>-<n>/application_id.npy   int64 [n]
+#     shard-<gen>-<n>/features.npy         float32 [n, 9] (normalized, loan_model.FEATURE_COLUMNS order)
+#     shard-<gen>-<n>/labels.npy           float32 [n] (Rule-Based Teacher)
+#     shard-<gen>-<n>/live.g<gen>.npy      bool [n], False where a newer shard holds the application
+# Exports are incremental: only applications with a prediction newer than the watermark, or behind
+# a PredictionID that committed late (see CHANGED_ROWS_QUERY), are appended.
+# Older copies of those applications are masked out, so every application is read once.
+# Shards left mostly dead by the masks, and runs of small per-export shards, are compacted: rewritten
+# with their live rows only, so disk use and shard count follow the live applications, not the exports.
+STORE_DIR = os.environ.get('FEATURE_STORE_DIR', 'feature_store')
+SHARD_ROWS = int(os.environ.get('FEATURE_STORE_SHARD_ROWS', 100000))
+EXPORT_CHUNK_ROWS = 20000 # Rows per server-side cursor fetch
+EXPORT_LOOKBACK = int(os.environ.get('FEATURE_STORE_LOOKBACK', 50000)) # PredictionIDs below the watermark still watched for late commits
+COMPACT_LIVE_FRACTION = 0.5 # Shards with fewer live rows than this fraction are rewritten
+COMPACT_SMALL_SHARDS = 8 # Shards under half of SHARD_ROWS tolerated before they are merged
+MANIFEST_FILE = 'manifest.json'
+STORE_VERSION = 1
+
+# Applications decided after the watermark, in the claim-row layout used by the predictor
+# (AppID, ReqAmount, Income, Score, Debt, DTI, Collateral, AccountAge, AvgTrans, Priority, Loyalty).
+# Walks the Predictions primary key for the watermark range.
+# PredictionIDs come from a sequence at INSERT time, not at COMMIT: with several predictor workers a
+# page holding IDs 100-199 can commit after another worker's IDs 200-299. An export in between sees
+# MAX = 299, and a plain "PredictionID > watermark" would never return IDs 100-199 afterwards.
+# So each export also records the gaps: IDs up to the watermark its snapshot did not see (in-flight
+# or rolled back, PRESENT_IDS_QUERY). The next export reads the gaps that have filled in since
+# (%(filled)s) along with the new range, so late pages are appended once and nothing is re-read.
+# Gaps more than EXPORT_LOOKBACK IDs below the watermark are dropped: a predictor page is committed
+# or rolled back long before that many newer IDs are handed out.
+CHANGED_ROWS_QUERY = """
+    WITH changed AS (
+        SELECT ApplicationID FROM Predictions
+        WHERE PredictionID > %(since)s AND PredictionID <= %(until)s
+        UNION
+        SELECT ApplicationID FROM Predictions
+        WHERE PredictionID = ANY(%(filled)s)
+    )
+    SELECT LA.ApplicationID, LA.RequestAmount,
+           FP.AnnualIncome, FP.CreditScore, FP.ExistingDebt, FP.DebtToIncomeRatio, FP.CollateralValue,
+           FP.AccountAgeDays, FP.AvgTransactionCount, LA.ProcessingPriority, A.LoyaltyPoints
+    FROM changed C
+    JOIN LoanApplications LA ON LA.ApplicationID = C.ApplicationID
+    JOIN Applicants A ON LA.ApplicantID = A.ApplicantID
+    JOIN FinancialProfile FP ON A.ApplicantID = FP.ApplicantID
+    WHERE LA.Status IN ('Approved', 'Rejected')
+    ORDER BY LA.ApplicationID
+"""
+
+# IDs visible in the watched part of the new range, plus the recorded gaps that have filled in
+PRESENT_IDS_QUERY = """
+    SELECT PredictionID FROM Predictions WHERE PredictionID > %(low)s AND PredictionID <= %(until)s
+    UNION ALL
+    SELECT PredictionID FROM Predictions WHERE PredictionID = ANY(%(gaps)s)
+"""
+
+def empty_manifest():
+    return {'version': STORE_VERSION, 'feature_schema': model_registry.feature_schema(),
+            'watermark': 0, 'gaps': [], 'generation': 0, 'shards': []}
+
+def load_manifest(store_dir=STORE_DIR):
+    try:
+        with open(os.path.join(store_dir, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return empty_manifest()
+
+def save_manifest(manifest, store_dir=STORE_DIR):
+    # Readers see either the old or the new snapshot, never a mix
+    path = os.path.join(store_dir, MANIFEST_FILE)
+    staging = f"{path}.{os.getpid()}.tmp"
+    with open(staging, 'w') as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(staging, path)
+
+def is_compatible(manifest):
+    return manifest.get('version') == STORE_VERSION and manifest.get('feature_schema') == model_registry.feature_schema()
+
+def write_shard(store_dir, name, app_ids, features, labels, generation):
+    # Written to a hidden directory and renamed, so a half-written shard is never visible
+    staging = os.path.join(store_dir, f".{name}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    np.save(os.path.join(staging, 'application_id.npy'), app_ids)
+    np.save(os.path.join(staging, 'features.npy'), features)
+    np.save(os.path.join(staging, 'labels.npy'), labels)
+    live_file = f"live.g{generation}.npy"
+    np.save(os.path.join(staging, live_file), np.ones(len(app_ids), dtype=bool))
+    os.replace(staging, os.path.join(store_dir, name))
+    return {'name': name, 'rows': int(len(app_ids)), 'live_file': live_file, 'live_rows': int(len(app_ids))}
+
+def iter_changed_rows(conn, since, until, filled):
+    cursor = conn.cursor(name='feature_store_export')
+    cursor.itersize = EXPORT_CHUNK_ROWS
+    try:
+        cursor.execute(CHANGED_ROWS_QUERY, {'since': since, 'until': until, 'filled': filled})
+        while True:
+            rows = cursor.fetchmany(EXPORT_CHUNK_ROWS)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cursor.close()
+        conn.rollback()
+
+def export(conn, store_dir=STORE_DIR, rebuild=False):
+    # Appends applications decided since the last export. Returns the number of rows appended.
+    manifest = load_manifest(store_dir)
+    if rebuild or not is_compatible(manifest):
+        if manifest['shards']:
+            print("Feature schema changed (or rebuild requested): exporting from scratch.")
+        shutil.rmtree(store_dir, ignore_errors=True)
+        manifest = empty_manifest()
+    os.makedirs(store_dir, exist_ok=True)
+    remove_unreferenced_shards(manifest, store_dir) # Leftovers of an export that died before its manifest
+
+    # One snapshot for the watermark, the gaps and the rows: an ID committing in between is either
+    # read now or recorded as a gap, never neither
+    conn.rollback()
+    cursor = conn.cursor()
+    cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+    cursor.execute("SELECT COALESCE(MAX(PredictionID), 0) FROM Predictions")
+    until = cursor.fetchone()[0]
+    since = manifest['watermark']
+    gaps = np.array(manifest.get('gaps', []), dtype=np.int64)
+    low = max(since, until - EXPORT_LOOKBACK)
+    cursor.execute(PRESENT_IDS_QUERY, {'low': low, 'until': until, 'gaps': gaps.tolist()})
+    present = np.array([row[0] for row in cursor.fetchall()], dtype=np.int64)
+    filled = np.intersect1d(gaps, present)
+    missing = np.setdiff1d(np.concatenate([gaps, np.arange(low + 1, until + 1, dtype=np.int64)]), present)
+    if until <= since and not len(filled):
+        conn.rollback()
+        print(f"Feature store is up to date (watermark {since}).")
+        return 0
+
+    generation = manifest['generation'] + 1
+    new_shards = []
+    buffer = []
+    buffered = 0
+
+    def flush():
+        nonlocal buffered
+        app_ids = np.concatenate([b[0] for b in buffer])
+        features = np.concatenate([b[1] for b in buffer])
+        labels = np.concatenate([b[2] for b in buffer])
+        name = f"shard-{generation:06d}-{len(new_shards):04d}"
+        new_shards.append(write_shard(store_dir, name, app_ids, features, labels, generation))
+        buffer.clear()
+        buffered = 0
+
+    for rows in iter_changed_rows(conn, since, until, filled.tolist()):
+        buffer.append((np.array([row[0] for row in rows], dtype=np.int64),
+                       loan_model.prepare_features_batch(rows, start=2),
+                       agent_predictor.teacher_labels(rows)))
+        buffered += len(rows)
+        if buffered >= SHARD_ROWS:
+            flush()
+    if buffer:
+        flush()
+
+    appended = sum(shard['rows'] for shard in new_shards)
+    if appended:
+        # Dedup by ApplicationID: older copies of re-exported applications are masked out
+        changed = np.concatenate([np.load(os.path.join(store_dir, s['name'], 'application_id.npy')) for s in new_shards])
+        for shard in manifest['shards']:
+            shard_dir = os.path.join(store_dir, shard['name'])
+            app_ids = np.load(os.path.join(shard_dir, 'application_id.npy'), mmap_mode='r')
+            stale = np.isin(app_ids, changed)
+            if not stale.any():
+                continue
+            live = np.load(os.path.join(shard_dir, shard['live_file'])) & ~stale
+            live_file = f"live.g{generation}.npy"
+            np.save(os.path.join(shard_dir, live_file), live)
+            shard['old_live_file'] = shard['live_file']
+            shard['live_file'] = live_file
+            shard['live_rows'] = int(live.sum())
+
+    # Compaction: live rows of sparse shards (and of small ones, once there are too many) are copied
+    # into fresh shards of this generation; the old directories go with the previous manifest
+    shards = [s for s in manifest['shards'] if s['live_rows'] > 0]
+    sparse = [s for s in shards if s['live_rows'] < COMPACT_LIVE_FRACTION * s['rows']]
+    small = [s for s in shards if s not in sparse and s['rows'] < SHARD_ROWS // 2]
+    compact = sparse + (small if len(small) > COMPACT_SMALL_SHARDS else [])
+    for shard in compact:
+        shard_dir = os.path.join(store_dir, shard['name'])
+        live = np.load(os.path.join(shard_dir, shard['live_file']))
+        buffer.append((np.load(os.path.join(shard_dir, 'application_id.npy'))[live],
+                       np.load(os.path.join(shard_dir, 'features.npy'))[live],
+                       np.load(os.path.join(shard_dir, 'labels.npy'))[live]))
+        buffered += len(buffer[-1][0])
+        if buffered >= SHARD_ROWS:
+            flush()
+    if buffer:
+        flush()
+    compacted = [s['name'] for s in compact]
+
+    # Publish the new snapshot, then drop masks only the previous manifest referenced
+    old_masks = [(s['name'], s.pop('old_live_file')) for s in manifest['shards'] if 'old_live_file' in s]
+    manifest['shards'] = [s for s in shards if s['name'] not in compacted] + new_shards
+    manifest['watermark'] = int(max(until, since))
+    manifest['gaps'] = missing[missing > until - EXPORT_LOOKBACK].tolist()
+    manifest['generation'] = generation
+    save_manifest(manifest, store_dir)
+    for name, mask in old_masks:
+        try:
+            os.remove(os.path.join(store_dir, name, mask))
+        except FileNotFoundError:
+            pass
+    remove_unreferenced_shards(manifest, store_dir)
+
+    print(f"Exported {appended} applications (watermark {since} -> {until}, {len(filled)} late IDs, "
+          f"{len(compact)} shards compacted, {len(manifest['shards'])} shards).")
+    return appended
+
+def remove_unreferenced_shards(manifest, store_dir=STORE_DIR):
+    # Shards whose rows were all superseded (readers that mapped them keep their open files)
+    referenced = {s['name'] for s in manifest['shards']}
+    for name in os.listdir(store_dir):
+        if name.startswith('shard-') and name not in referenced:
+            shutil.rmtree(os.path.join(store_dir, name), ignore_errors=True)
+
+def iter_chunks(split=None, store_dir=STORE_DIR, chunk_rows=EXPORT_CHUNK_ROWS, holdout_modulus=5):
+    # Streams (features, labels) chunks of live rows from the memory-mapped shards.
+    # split: None for everything, 'train' / 'holdout' for the ApplicationID % holdout_modulus split.
+    manifest = load_manifest(store_dir)
+    if not is_compatible(manifest):
+        raise ValueError("Feature store was built for a different feature schema; run feature_store.py export --rebuild")
+    for shard in manifest['shards']:
+        shard_dir = os.path.join(store_dir, shard['name'])
+        app_ids = np.load(os.path.join(shard_dir, 'application_id.npy'), mmap_mode='r')
+        features = np.load(os.path.join(shard_dir, 'features.npy'), mmap_mode='r')
+        labels = np.load(os.path.join(shard_dir, 'labels.npy'), mmap_mode='r')
+        live = np.load(os.path.join(shard_dir, shard['live_file']), mmap_mode='r')
+        for start in range(0, shard['rows'], chunk_rows):
+            stop = start + chunk_rows
+            mask = np.asarray(live[start:stop])
+            if split is not None:
+                held_out = np.asarray(app_ids[start:stop]) % holdout_modulus == 0
+                mask = mask & (held_out if split == 'holdout' else ~held_out)
+            if mask.all():
+                yield features[start:stop], labels[start:stop] # Zero-copy views of the mapping
+            elif mask.any():
+                yield features[start:stop][mask], labels[start:stop][mask]
+
+def stats(store_dir=STORE_DIR):
+    manifest = load_manifest(store_dir)
+    rows = sum(s['rows'] for s in manifest['shards'])
+    live = sum(s['live_rows'] for s in manifest['shards'])
+    return {'watermark': manifest['watermark'], 'shards': len(manifest['shards']), 'rows': rows, 'live_rows': live}
+
+if __name__ == '__main__':
+    command = sys.argv[1] if len(sys.argv) > 1 else 'export'
+    if command == 'export':
+        with db_config.connection() as conn:
+            if not conn:
+                print("Database unavailable.")
+                sys.exit(1)
+            export(conn, rebuild='--rebuild' in sys.argv)
+        print(json.dumps(stats()))
+    elif command == 'stats':
+        print(json.dumps(stats()))
+    else:
+        print("Usage: python feature_store.py [export [--rebuild] | stats]")
+        sys.exit(1)
@@ -1,44 +1,61 @@
 import db_config
 from faker import Faker
+from psycopg2.extras import execute_values
+import argparse
+import csv
+import io
+import multiprocessing
 import random
 import time
-import sys
 
 # Configuration
 BATCH_SIZE = 10  # Generate 10 at a time
 DELAY_SECONDS = 5 # Wait 5 seconds between batches for demo purposes
-INITIAL_POPULATION = 200
+INITIAL_POPULATION = 200 # Default for --bulk-only, override with --population
+SEED_CHUNK_SIZE = 1000 # Records generated from one derived seed (the unit of parallel work)
+SAMPLE_OVERSAMPLE = 2 # Random IDs drawn per applicant wanted (covers gaps in the ID range)
+SAMPLE_ROUNDS = 5 # Redraws before settling for fewer applicants than asked
 
 # Initialize Faker with Indian Locale
+# The generators below take rng / faker arguments so seeded runs can use private instances
 fake = Faker('en_IN')
+_chunk_fake = None # Per-process instance reseeded for every chunk
 
-def generate_applicant():
+EMPLOYMENT_STATUSES = ['Salaried', 'Self-Employed', 'Unemployed', 'Retired']
+
+def pick_employment_status(rng=random, employment_weights=None):
+    # employment_weights (aligned with EMPLOYMENT_STATUSES) skews the mix; default is uniform
+    if employment_weights:
+        return rng.choices(EMPLOYMENT_STATUSES, weights=employment_weights)[0]
+    return rng.choice(EMPLOYMENT_STATUSES)
+
+def generate_applicant(rng=random, faker=fake, employment_weights=None):
     return {
-        'FirstName': fake.first_name(),
-        'LastName': fake.last_name(),
-        'Age': random.randint(21, 65),
-        'Email': fake.email(),
-        'Address': fake.address().replace('\n', ', '),
-        'PhoneNumber': fake.phone_number(),
-        'MaidenName': fake.last_name() if random.random() < 0.3 else None,
-        'SocialMediaHandle': '@' + fake.user_name() if random.random() < 0.6 else None,
-        'LastLoginIP': fake.ipv4(),
-        'LoyaltyPoints': random.randint(0, 5000),
-        'EmploymentStatus': random.choice(['Salaried', 'Self-Employed', 'Unemployed', 'Retired']),
-        'JobTitle': fake.job(),
-        'YearsExperience': random.randint(0, 40)
+        'FirstName': faker.first_name(),
+        'LastName': faker.last_name(),
+        'Age': rng.randint(21, 65),
+        'Email': faker.email(),
+        'Address': faker.address().replace('\n', ', '),
+        'PhoneNumber': faker.phone_number(),
+        'MaidenName': faker.last_name() if rng.random() < 0.3 else None,
+        'SocialMediaHandle': '@' + faker.user_name() if rng.random() < 0.6 else None,
+        'LastLoginIP': faker.ipv4(),
+        'LoyaltyPoints': rng.randint(0, 5000),
+        'EmploymentStatus': pick_employment_status(rng, employment_weights),
+        'JobTitle': faker.job(),
+        'YearsExperience': rng.randint(0, 40)
     }
 
-def generate_financials(employment_status):
+def generate_financials(employment_status, rng=random, faker=fake):
     # Income in INR (Annual)
     if employment_status == 'Unemployed':
-        income = random.uniform(0, 100000) # 0 to 1 Lakh
-        credit_score = random.randint(300, 650)
+        income = rng.uniform(0, 100000) # 0 to 1 Lakh
+        credit_score = rng.randint(300, 650)
     else:
-        income = random.uniform(300000, 3000000) # 3 Lakhs to 30 Lakhs
-        credit_score = random.randint(550, 850) # CIBIL typically 300-900, scaled here
+        income = rng.uniform(300000, 3000000) # 3 Lakhs to 30 Lakhs
+        credit_score = rng.randint(550, 850) # CIBIL typically 300-900, scaled here
     
-    existing_debt = random.uniform(0, income * 0.4)
+    existing_debt = rng.uniform(0, income * 0.4)
     dti = (existing_debt / income) if income > 0 else 0
     
     return {
@@ -46,18 +63,18 @@ def generate_financials(employment_status):
         'CreditScore': credit_score,
         'ExistingDebt': round(existing_debt, 2),
         'DebtToIncomeRatio': round(dti, 2),
-        'CollateralValue': round(random.uniform(0, 5000000), 2), # Up to 50 Lakhs
-        'CollateralType': random.choice(['Residential Property', 'Vehicle', 'Fixed Deposits', 'Gold', 'None']),
-        'AccountAgeDays': random.randint(100, 5000),
-        'AvgTransactionCount': random.randint(5, 100),
-        'LastBranchVisited': fake.city() + " Branch"
+        'CollateralValue': round(rng.uniform(0, 5000000), 2), # Up to 50 Lakhs
+        'CollateralType': rng.choice(['Residential Property', 'Vehicle', 'Fixed Deposits', 'Gold', 'None']),
+        'AccountAgeDays': rng.randint(100, 5000),
+        'AvgTransactionCount': rng.randint(5, 100),
+        'LastBranchVisited': faker.city() + " Branch"
     }
 
-def generate_loan_request(income, collateral):
+def generate_loan_request(income, collateral, rng=random, faker=fake):
     # Loan Request in INR
     max_reasonable = (income * 4) + (collateral * 0.7)
-    request_amount = random.uniform(50000, max(100000, max_reasonable)) # Min 50k
-    purpose = random.choice(['Home Purchase', 'Business Expansion', 'Higher Education', 'Medical Emergency', 'Personal Loan'])
+    request_amount = rng.uniform(50000, max(100000, max_reasonable)) # Min 50k
+    purpose = rng.choice(['Home Purchase', 'Business Expansion', 'Higher Education', 'Medical Emergency', 'Personal Loan'])
     
     total_asset_value = request_amount + collateral
     ltc = request_amount / total_asset_value if total_asset_value > 0 else 1.0
@@ -66,58 +83,128 @@ def generate_loan_request(income, collateral):
         'RequestAmount': round(request_amount, 2),
         'LoanPurpose': purpose,
         'LoanToCostRatio': round(ltc, 2),
-        'ApplicationSource': random.choice(['Mobile App', 'Website', 'Branch Referral', 'Partner']),
-        'ReferralCode': fake.bothify(text='REF-####-????') if random.random() < 0.2 else None,
-        'ProcessingPriority': random.randint(1, 10)
+        'ApplicationSource': rng.choice(['Mobile App', 'Website', 'Branch Referral', 'Partner']),
+        'ReferralCode': faker.bothify(text='REF-####-????') if rng.random() < 0.2 else None,
+        'ProcessingPriority': rng.randint(1, 10)
     }
 
-def update_existing_applicant(cursor):
+# Life-event queries (VALUES %s is filled in by execute_values)
+SAMPLE_APPLICANTS_QUERY = "SELECT ApplicantID, EmploymentStatus FROM Applicants WHERE ApplicantID = ANY(%s)"
+
+EMPLOYMENT_UPDATE_QUERY = """
+    UPDATE Applicants AS a SET EmploymentStatus = v.EmploymentStatus
+    FROM (VALUES %s) AS v (ApplicantID, EmploymentStatus)
+    WHERE a.ApplicantID = v.ApplicantID
+"""
+
+FINANCIAL_UPDATE_QUERY = """
+    UPDATE FinancialProfile AS f
+    SET AnnualIncome = v.AnnualIncome, CreditScore = v.CreditScore, ExistingDebt = v.ExistingDebt,
+        DebtToIncomeRatio = v.DebtToIncomeRatio, CollateralValue = v.CollateralValue, CollateralType = v.CollateralType,
+        AccountAgeDays = v.AccountAgeDays, AvgTransactionCount = v.AvgTransactionCount, LastBranchVisited = v.LastBranchVisited
+    FROM (VALUES %s) AS v (ApplicantID, AnnualIncome, CreditScore, ExistingDebt, DebtToIncomeRatio, CollateralValue,
+                           CollateralType, AccountAgeDays, AvgTransactionCount, LastBranchVisited)
+    WHERE f.ApplicantID = v.ApplicantID
+"""
+# Casts keep the VALUES columns typed like the target table, whatever the first row looks like
+FINANCIAL_UPDATE_TEMPLATE = "(%s, %s::numeric, %s::int, %s::numeric, %s::numeric, %s::numeric, %s, %s::int, %s::int, %s)"
+
+# CRITICAL: Reset Status to 'Pending' so the Prediction Agent re-evaluates
+LOAN_RESET_QUERY = """
+    UPDATE LoanApplications AS l
+    SET Status = 'Pending', RequestAmount = v.RequestAmount, LoanToCostRatio = v.LoanToCostRatio,
+        ClaimedBy = NULL, LeaseExpiresAt = NULL
+    FROM (VALUES %s) AS v (ApplicantID, RequestAmount, LoanToCostRatio)
+    WHERE l.ApplicantID = v.ApplicantID
+"""
+LOAN_UPDATE_TEMPLATE = "(%s, %s::numeric, %s::numeric)"
+
+def sample_applicants(cursor, count, rng=random):
+    """
+    Picks up to `count` distinct random applicants without sorting the table.
+    Draws random IDs below MAX(ApplicantID) (a primary key lookup) and keeps the ones
+    that exist; gaps left by rolled-back inserts are simply redrawn.
+    """
+    cursor.execute("SELECT MAX(ApplicantID) FROM Applicants")
+    max_id = cursor.fetchone()[0]
+    if not max_id:
+        return [] # No applicants yet
+    
+    count = min(count, max_id)
+    found = {}
+    for _ in range(SAMPLE_ROUNDS):
+        wanted = count - len(found)
+        if wanted <= 0:
+            break
+        candidates = {rng.randint(1, max_id) for _ in range(wanted * SAMPLE_OVERSAMPLE)} - found.keys()
+        cursor.execute(SAMPLE_APPLICANTS_QUERY, (sorted(candidates),))
+        rows = cursor.fetchall()
+        rng.shuffle(rows) # Oversampled hits come back in ID order, don't favour low IDs
+        for app_id, emp_status in rows[:wanted]:
+            found[app_id] = emp_status
+    return list(found.items())
+
+def generate_life_event(app_id, emp_status, rng=random, faker=fake):
+    # New circumstances for one applicant: (ApplicantID, new EmploymentStatus or None, financials, loan changes)
+    new_status = None
+    if rng.random() < 0.1: # 10% chance to change employment status
+        emp_status = rng.choice(EMPLOYMENT_STATUSES)
+        new_status = emp_status
+    
+    fin_data = generate_financials(emp_status, rng, faker)
+    
+    # UPDATE: Also update Request Amount to make it dynamic as per User Request
+    new_loan_data = generate_loan_request(fin_data['AnnualIncome'], fin_data['CollateralValue'], rng, faker)
+    return app_id, new_status, fin_data, new_loan_data
+
+def apply_life_events(cursor, events):
+    """
+    Writes a batch of life events with one set-based UPDATE per table:
+    employment changes, new financials, and the loan reset to 'Pending'.
+    If an applicant appears twice, the later event wins (same as applying them in order).
+    """
+    merged = {}
+    for app_id, new_status, fin_data, new_loan_data in events:
+        if new_status is None and app_id in merged:
+            new_status = merged[app_id][1]
+        merged.pop(app_id, None) # Re-insert so the order reflects the last event
+        merged[app_id] = (app_id, new_status, fin_data, new_loan_data)
+    if not merged:
+        return
+    
+    status_rows = [(app_id, new_status) for app_id, new_status, _, _ in merged.values() if new_status is not None]
+    if status_rows:
+        execute_values(cursor, EMPLOYMENT_UPDATE_QUERY, status_rows, page_size=len(status_rows))
+    
+    fin_rows = [(app_id, fin_data['AnnualIncome'], fin_data['CreditScore'], fin_data['ExistingDebt'],
+                 fin_data['DebtToIncomeRatio'], fin_data['CollateralValue'], fin_data['CollateralType'],
+                 fin_data['AccountAgeDays'], fin_data['AvgTransactionCount'], fin_data['LastBranchVisited'])
+                for app_id, _, fin_data, _ in merged.values()]
+    execute_values(cursor, FINANCIAL_UPDATE_QUERY, fin_rows, template=FINANCIAL_UPDATE_TEMPLATE, page_size=len(fin_rows))
+    
+    loan_rows = [(app_id, new_loan_data['RequestAmount'], new_loan_data['LoanToCostRatio'])
+                 for app_id, _, _, new_loan_data in merged.values()]
+    execute_values(cursor, LOAN_RESET_QUERY, loan_rows, template=LOAN_UPDATE_TEMPLATE, page_size=len(loan_rows))
+
+def update_existing_applicants(cursor, count, rng=random, faker=fake):
     """
-    Randomly selects an existing applicant and updates their financial profile
+    Randomly selects existing applicants and updates their financial profiles
     to simulate a change in circumstances (Raise, New Debt, etc.),
-    and flags them for Re-evaluation.
+    and flags them for Re-evaluation. Returns the updated ApplicantIDs.
     """
     try:
-        # Pick a random applicant (Postgres syntax for Random Sort)
-        cursor.execute("SELECT ApplicantID, EmploymentStatus FROM Applicants ORDER BY RANDOM() LIMIT 1")
-        row = cursor.fetchone()
-        
-        if not row:
-            return None # No applicants yet
-            
-        app_id, emp_status = row
-        
-        # Generate varied financial data (simulating change)
-        if random.random() < 0.1: # 10% chance to change employment status
-            emp_status = random.choice(['Salaried', 'Self-Employed', 'Unemployed', 'Retired'])
-            cursor.execute("UPDATE Applicants SET EmploymentStatus = %s WHERE ApplicantID = %s", (emp_status, app_id))
-            
-        fin_data = generate_financials(emp_status)
-        
-        # Update Financial Table
-        cursor.execute("""
-            UPDATE FinancialProfile 
-            SET AnnualIncome = %s, CreditScore = %s, ExistingDebt = %s, DebtToIncomeRatio = %s, CollateralValue = %s, CollateralType = %s,
-                AccountAgeDays = %s, AvgTransactionCount = %s, LastBranchVisited = %s
-            WHERE ApplicantID = %s
-        """, (fin_data['AnnualIncome'], fin_data['CreditScore'], fin_data['ExistingDebt'], 
-             fin_data['DebtToIncomeRatio'], fin_data['CollateralValue'], fin_data['CollateralType'],
-             fin_data['AccountAgeDays'], fin_data['AvgTransactionCount'], fin_data['LastBranchVisited'], app_id))
-             
-        # CRITICAL: Reset Status to 'Pending' so the Prediction Agent re-evaluates
-        # UPDATE: Also update Request Amount to make it dynamic as per User Request
-        new_loan_data = generate_loan_request(fin_data['AnnualIncome'], fin_data['CollateralValue'])
-        
-        cursor.execute("""
-            UPDATE LoanApplications 
-            SET Status = 'Pending', RequestAmount = %s, LoanToCostRatio = %s 
-            WHERE ApplicantID = %s
-        """, (new_loan_data['RequestAmount'], new_loan_data['LoanToCostRatio'], app_id))
-        
-        return app_id
+        sampled = sample_applicants(cursor, count, rng)
+        events = [generate_life_event(app_id, emp_status, rng, faker) for app_id, emp_status in sampled]
+        apply_life_events(cursor, events)
+        return [app_id for app_id, _ in sampled]
     except Exception as e:
-        print(f"Error updating applicant: {e}")
-        return None
+        print(f"Error updating applicants: {e}")
+        return []
+
+def update_existing_applicant(cursor):
+    # Single-applicant form, kept for callers that update one at a time
+    updated = update_existing_applicants(cursor, 1)
+    return updated[0] if updated else None
 
 def main():
     print("Starting Continuous Data Generation Agent (Simulating Days)...")
@@ -127,124 +214,174 @@ def main():
     day_count = 1
     
     while True:
-        conn = db_config.get_connection()
-        if not conn:
-            print("Waiting for Database Config...")
-            time.sleep(10)
-            continue
+        with db_config.connection() as conn:
+            if not conn:
+                print("Waiting for Database Config...")
+                time.sleep(10)
+                continue
             
-        cursor = conn.cursor()
+            cursor = conn.cursor()
         
-        try:
-            print(f"\n--- Day {day_count} ---")
+            try:
+                print(f"\n--- Day {day_count} ---")
             
-            # 1. Generate NEW Applicants (Morning Batch)
-            print(f"Generating batch of {BATCH_SIZE} NEW applicants...")
-            for _ in range(BATCH_SIZE):
-                # Applicant
-                app_data = generate_applicant()
-                cursor.execute("""
-                    INSERT INTO Applicants (FirstName, LastName, Age, Email, Address, PhoneNumber, MaidenName, SocialMediaHandle, LastLoginIP, LoyaltyPoints, EmploymentStatus, JobTitle, YearsExperience) 
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    RETURNING ApplicantID
-                """, (app_data['FirstName'], app_data['LastName'], app_data['Age'], app_data['Email'], app_data['Address'], app_data['PhoneNumber'],
-                     app_data['MaidenName'], app_data['SocialMediaHandle'], app_data['LastLoginIP'], app_data['LoyaltyPoints'],
-                     app_data['EmploymentStatus'], app_data['JobTitle'], app_data['YearsExperience']))
+                # 1. Generate NEW Applicants (Morning Batch)
+                print(f"Generating batch of {BATCH_SIZE} NEW applicants...")
+                for _ in range(BATCH_SIZE):
+                    # Applicant
+                    app_data = generate_applicant()
+                    cursor.execute("""
+                        INSERT INTO Applicants (FirstName, LastName, Age, Email, Address, PhoneNumber, MaidenName, SocialMediaHandle, LastLoginIP, LoyaltyPoints, EmploymentStatus, JobTitle, YearsExperience) 
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        RETURNING ApplicantID
+                    """, (app_data['FirstName'], app_data['LastName'], app_data['Age'], app_data['Email'], app_data['Address'], app_data['PhoneNumber'],
+                         app_data['MaidenName'], app_data['SocialMediaHandle'], app_data['LastLoginIP'], app_data['LoyaltyPoints'],
+                         app_data['EmploymentStatus'], app_data['JobTitle'], app_data['YearsExperience']))
                 
-                applicant_id = cursor.fetchone()[0]
-
-                # Financials
-                fin_data = generate_financials(app_data['EmploymentStatus'])
-                cursor.execute("""
-                    INSERT INTO FinancialProfile (ApplicantID, AnnualIncome, CreditScore, ExistingDebt, DebtToIncomeRatio, CollateralValue, CollateralType, AccountAgeDays, AvgTransactionCount, LastBranchVisited)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (applicant_id, fin_data['AnnualIncome'], fin_data['CreditScore'], fin_data['ExistingDebt'], 
-                     fin_data['DebtToIncomeRatio'], fin_data['CollateralValue'], fin_data['CollateralType'],
-                     fin_data['AccountAgeDays'], fin_data['AvgTransactionCount'], fin_data['LastBranchVisited']))
-
-                # Loan Request
-                loan_data = generate_loan_request(fin_data['AnnualIncome'], fin_data['CollateralValue'])
-                cursor.execute("""
-                    INSERT INTO LoanApplications (ApplicantID, RequestAmount, LoanPurpose, LoanToCostRatio, ApplicationSource, ReferralCode, ProcessingPriority)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """, (applicant_id, loan_data['RequestAmount'], loan_data['LoanPurpose'], loan_data['LoanToCostRatio'],
-                     loan_data['ApplicationSource'], loan_data['ReferralCode'], loan_data['ProcessingPriority']))
-
-            # 2. Update EXISTING Applicants (Afternoon Events)
-            update_count = random.randint(2, 5)
-            print(f"Updating {update_count} existing applicants (Re-evaluation triggers)...")
-            updated_ids = []
-            for _ in range(update_count):
-                uid = update_existing_applicant(cursor)
-                if uid: updated_ids.append(uid)
+                    applicant_id = cursor.fetchone()[0]
+
+                    # Financials
+                    fin_data = generate_financials(app_data['EmploymentStatus'])
+                    cursor.execute("""
+                        INSERT INTO FinancialProfile (ApplicantID, AnnualIncome, CreditScore, ExistingDebt, DebtToIncomeRatio, CollateralValue, CollateralType, AccountAgeDays, AvgTransactionCount, LastBranchVisited)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    """, (applicant_id, fin_data['AnnualIncome'], fin_data['CreditScore'], fin_data['ExistingDebt'], 
+                         fin_data['DebtToIncomeRatio'], fin_data['CollateralValue'], fin_data['CollateralType'],
+                         fin_data['AccountAgeDays'], fin_data['AvgTransactionCount'], fin_data['LastBranchVisited']))
+
+                    # Loan Request
+                    loan_data = generate_loan_request(fin_data['AnnualIncome'], fin_data['CollateralValue'])
+                    cursor.execute("""
+                        INSERT INTO LoanApplications (ApplicantID, RequestAmount, LoanPurpose, LoanToCostRatio, ApplicationSource, ReferralCode, ProcessingPriority)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    """, (applicant_id, loan_data['RequestAmount'], loan_data['LoanPurpose'], loan_data['LoanToCostRatio'],
+                         loan_data['ApplicationSource'], loan_data['ReferralCode'], loan_data['ProcessingPriority']))
+
+                # 2. Update EXISTING Applicants (Afternoon Events)
+                update_count = random.randint(2, 5)
+                print(f"Updating {update_count} existing applicants (Re-evaluation triggers)...")
+                updated_ids = update_existing_applicants(cursor, update_count)
                 
-            conn.commit()
-            print(f"Day {day_count} Complete. New: {BATCH_SIZE}, Updated: {len(updated_ids)} (IDs: {updated_ids})")
-            print(f"Sleeping for {DELAY_SECONDS} seconds to simulate night...")
+                conn.commit()
+                print(f"Day {day_count} Complete. New: {BATCH_SIZE}, Updated: {len(updated_ids)} (IDs: {updated_ids})")
+                print(f"Sleeping for {DELAY_SECONDS} seconds to simulate night...")
             
-            day_count += 1
-            cursor.close()
-            conn.close()
-            time.sleep(DELAY_SECONDS)
+                day_count += 1
+                cursor.close()
             
-        except Exception as e:
-            print(f"Error in generation loop: {e}")
-            if conn: conn.close()
-            time.sleep(5)
+            except Exception as e:
+                print(f"Error in generation loop: {e}")
+                time.sleep(5)
+                continue
+        
+        # Connection goes back to the pool while the simulated night passes
+        time.sleep(DELAY_SECONDS)
+
+# Column order for COPY-based bulk loading
+APPLICANT_COLUMNS = ['ApplicantID', 'FirstName', 'LastName', 'Age', 'Email', 'Address', 'PhoneNumber', 'MaidenName',
+                     'SocialMediaHandle', 'LastLoginIP', 'LoyaltyPoints', 'EmploymentStatus', 'JobTitle', 'YearsExperience']
+FINANCIAL_COLUMNS = ['ApplicantID', 'AnnualIncome', 'CreditScore', 'ExistingDebt', 'DebtToIncomeRatio', 'CollateralValue',
+                     'CollateralType', 'AccountAgeDays', 'AvgTransactionCount', 'LastBranchVisited']
+LOAN_COLUMNS = ['ApplicantID', 'RequestAmount', 'LoanPurpose', 'LoanToCostRatio', 'ApplicationSource', 'ReferralCode',
+                'ProcessingPriority']
+
+def generate_record(rng=random, faker=fake, employment_weights=None):
+    # One synthetic applicant with their financials and loan request (same logic as daily generation)
+    app_data = generate_applicant(rng, faker, employment_weights)
+    fin_data = generate_financials(app_data['EmploymentStatus'], rng, faker)
+    loan_data = generate_loan_request(fin_data['AnnualIncome'], fin_data['CollateralValue'], rng, faker)
+    return app_data, fin_data, loan_data
 
-def generate_bulk_data(conn):
+def chunk_seed(master_seed, chunk_index):
+    # A chunk's seed depends only on the master seed and its position,
+    # so the generated stream is the same for any number of workers
+    return random.Random(f"{master_seed}:{chunk_index}").getrandbits(64)
+
+def generate_chunk(task):
+    # Generates one chunk of records from its derived seed (runs in pool workers)
+    master_seed, chunk_index, size = task
+    global _chunk_fake
+    if _chunk_fake is None:
+        _chunk_fake = Faker('en_IN')
+    seed = chunk_seed(master_seed, chunk_index)
+    # Separate streams: seeded alike, Faker's Random and rng would draw the same numbers,
+    # tying names and addresses to ages, incomes and scores
+    _chunk_fake.seed_instance(f"{seed}:faker")
+    rng = random.Random(f"{seed}:rng")
+    return [generate_record(rng, _chunk_fake) for _ in range(size)]
+
+def iter_generated_chunks(population, master_seed, workers=1):
+    # Yields generated chunks in order; with workers > 1 they are produced by a process pool
+    tasks = [(master_seed, index, min(SEED_CHUNK_SIZE, population - start))
+             for index, start in enumerate(range(0, population, SEED_CHUNK_SIZE))]
+    if workers <= 1:
+        for task in tasks:
+            yield generate_chunk(task)
+        return
+    with multiprocessing.Pool(workers) as pool:
+        yield from pool.imap(generate_chunk, tasks)
+
+def copy_rows(cursor, table, columns, rows):
+    # Streams rows into a table with COPY FROM STDIN (CSV: empty unquoted field = NULL)
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+def copy_records(cursor, records):
+    # Bulk-inserts generated records in a fixed number of round trips:
+    # one to reserve ApplicantIDs from the sequence, then one COPY per table.
+    cursor.execute("SELECT nextval(pg_get_serial_sequence('applicants', 'applicantid')) FROM generate_series(1, %s)",
+                   (len(records),))
+    applicant_ids = [row[0] for row in cursor.fetchall()]
+    
+    copy_rows(cursor, 'Applicants', APPLICANT_COLUMNS,
+              ([applicant_id] + [app_data[c] for c in APPLICANT_COLUMNS[1:]]
+               for applicant_id, (app_data, _, _) in zip(applicant_ids, records)))
+    copy_rows(cursor, 'FinancialProfile', FINANCIAL_COLUMNS,
+              ([applicant_id] + [fin_data[c] for c in FINANCIAL_COLUMNS[1:]]
+               for applicant_id, (_, fin_data, _) in zip(applicant_ids, records)))
+    copy_rows(cursor, 'LoanApplications', LOAN_COLUMNS,
+              ([applicant_id] + [loan_data[c] for c in LOAN_COLUMNS[1:]]
+               for applicant_id, (_, _, loan_data) in zip(applicant_ids, records)))
+    return applicant_ids
+
+def generate_bulk_data(conn, population=INITIAL_POPULATION, batch_size=10000, workers=1, seed=None):
     cursor = conn.cursor()
-    print(f"--- INITIALIZING WORLD WITH {INITIAL_POPULATION} POPULATION ---")
+    if seed is None:
+        seed = random.randrange(2**32)
+    print(f"--- INITIALIZING WORLD WITH {population} POPULATION (seed {seed}, {workers} workers) ---")
     print("This may take a minute...")
     
-    batch_size = 1000
     total_generated = 0
+    records = []
     
-    while total_generated < INITIAL_POPULATION:
-        # Generate in chunks
-        current_batch = min(batch_size, INITIAL_POPULATION - total_generated)
-        
-        for _ in range(current_batch):
-            # Same logic as daily generation
-            app_data = generate_applicant()
-            cursor.execute("""
-                INSERT INTO Applicants (FirstName, LastName, Age, Email, Address, PhoneNumber, MaidenName, SocialMediaHandle, LastLoginIP, LoyaltyPoints, EmploymentStatus, JobTitle, YearsExperience) 
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                RETURNING ApplicantID
-            """, (app_data['FirstName'], app_data['LastName'], app_data['Age'], app_data['Email'], app_data['Address'], app_data['PhoneNumber'],
-                     app_data['MaidenName'], app_data['SocialMediaHandle'], app_data['LastLoginIP'], app_data['LoyaltyPoints'],
-                     app_data['EmploymentStatus'], app_data['JobTitle'], app_data['YearsExperience']))
-            
-            applicant_id = cursor.fetchone()[0]
-
-            fin_data = generate_financials(app_data['EmploymentStatus'])
-            cursor.execute("""
-                INSERT INTO FinancialProfile (ApplicantID, AnnualIncome, CreditScore, ExistingDebt, DebtToIncomeRatio, CollateralValue, CollateralType, AccountAgeDays, AvgTransactionCount, LastBranchVisited)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (applicant_id, fin_data['AnnualIncome'], fin_data['CreditScore'], fin_data['ExistingDebt'], 
-                    fin_data['DebtToIncomeRatio'], fin_data['CollateralValue'], fin_data['CollateralType'],
-                     fin_data['AccountAgeDays'], fin_data['AvgTransactionCount'], fin_data['LastBranchVisited']))
-
-            loan_data = generate_loan_request(fin_data['AnnualIncome'], fin_data['CollateralValue'])
-            cursor.execute("""
-                INSERT INTO LoanApplications (ApplicantID, RequestAmount, LoanPurpose, LoanToCostRatio, ApplicationSource, ReferralCode, ProcessingPriority)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """, (applicant_id, loan_data['RequestAmount'], loan_data['LoanPurpose'], loan_data['LoanToCostRatio'],
-                     loan_data['ApplicationSource'], loan_data['ReferralCode'], loan_data['ProcessingPriority']))
+    # Workers generate, this process is the single writer (COPY per batch)
+    for chunk in iter_generated_chunks(population, seed, workers):
+        records.extend(chunk)
+        if len(records) < batch_size and total_generated + len(records) < population:
+            continue
         
+        copy_records(cursor, records)
         conn.commit()
-        total_generated += current_batch
-        print(f"Generated {total_generated}/{INITIAL_POPULATION}...")
+        total_generated += len(records)
+        records = []
+        print(f"Generated {total_generated}/{population}...")
 
     print("--- WORLD GENERATION COMPLETE ---")
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Synthetic applicant generator (World Simulator).")
+    parser.add_argument('--bulk-only', action='store_true', help="Seed the initial population once and exit")
+    parser.add_argument('--population', type=int, default=INITIAL_POPULATION, help="Applicants to seed with --bulk-only")
+    parser.add_argument('--workers', type=int, default=1, help="Processes generating records for --bulk-only")
+    parser.add_argument('--seed', type=int, default=None, help="Master seed for a reproducible --bulk-only population")
+    args = parser.parse_args()
+    
     # Cloud Optimization: Limit endless loop or run once for GitHub Actions
-    if len(sys.argv) > 1 and sys.argv[1] == '--bulk-only':
-         conn = db_config.get_connection()
-         if conn:
-             generate_bulk_data(conn)
-             conn.close()
+    if args.bulk_only:
+         with db_config.connection() as conn:
+             if conn:
+                 generate_bulk_data(conn, args.population, workers=args.workers, seed=args.seed)
     else:
         main()
-
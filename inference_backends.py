@@ -0,0 +1,143 @@
+import os
+import warnings
+import numpy as np
+import loan_features
+import numpy_inference
+
+# Inference Backends for the Prediction Agent
+# Every backend scores an [N, 9] float32 feature matrix and returns a list of probabilities,
+# like loan_model.predict_batch.
+#   numpy        the three matmuls in NumPy (model.npz); no torch import at all, so the fastest start
+#   eager        LoanNet in regular PyTorch (the reference)
+#   torchscript  frozen TorchScript graph (model.ts in the registry version directory)
+#   onnx         ONNX graph run by onnxruntime (model.onnx); needs `pip install onnxruntime onnx`
+# Artifacts are derived from model.pth. They are exported on publish, or on first use for older versions.
+# torch (and loan_model, which needs it) is imported lazily, only by the backends and exports that use it.
+BACKENDS = ('numpy', 'eager', 'torchscript', 'onnx')
+DEFAULT_BACKEND = os.environ.get('INFERENCE_BACKEND', 'numpy')
+ARTIFACT_FILES = {'numpy': 'model.npz', 'torchscript': 'model.ts', 'onnx': 'model.onnx'}
+ONNX_INPUT = 'features'
+
+def example_input():
+    import torch
+    return torch.zeros(1, len(loan_features.FEATURE_COLUMNS), dtype=torch.float32)
+
+def load_eager_model(version_dir):
+    import torch
+    import loan_model
+    model = loan_model.LoanNet()
+    model.load_state_dict(torch.load(os.path.join(version_dir, 'model.pth')))
+    model.eval()
+    return model
+
+def export_npz(model, path):
+    numpy_inference.save_npz(model.state_dict(), path)
+
+def export_torchscript(model, path):
+    import torch
+    # Trace (the network has no control flow) and freeze: weights become constants, dispatch is cut down
+    model.eval()
+    with torch.no_grad(), warnings.catch_warnings():
+        warnings.simplefilter('ignore', FutureWarning) # torch.jit deprecation notices; the API still works
+        traced = torch.jit.trace(model, example_input())
+        frozen = torch.jit.freeze(traced)
+    staging = f"{path}.{os.getpid()}.tmp"
+    frozen.save(staging)
+    os.replace(staging, path)
+
+def export_onnx(model, path):
+    import torch
+    model.eval()
+    staging = f"{path}.{os.getpid()}.tmp"
+    torch.onnx.export(model, (example_input(),), staging, input_names=[ONNX_INPUT], output_names=['probability'],
+                      dynamic_axes={ONNX_INPUT: {0: 'batch'}, 'probability': {0: 'batch'}}, dynamo=False)
+    os.replace(staging, path)
+
+EXPORTERS = {'numpy': export_npz, 'torchscript': export_torchscript, 'onnx': export_onnx}
+
+def export_artifacts(model, version_dir, backends=('numpy', 'torchscript', 'onnx')):
+    # Best effort: a backend that cannot be exported here is simply unavailable for this version
+    for backend in backends:
+        try:
+            EXPORTERS[backend](model, os.path.join(version_dir, ARTIFACT_FILES[backend]))
+        except Exception as e:
+            print(f"Skipping {backend} export: {e}")
+
+class NumpyBackend:
+    name = 'numpy'
+
+    def __init__(self, path):
+        self.model = numpy_inference.NumpyLoanNet.load(path)
+
+    def predict(self, features, chunk_size=4096):
+        return self.model.predict(features, chunk_size=chunk_size)
+
+class EagerBackend:
+    name = 'eager'
+
+    def __init__(self, model):
+        import loan_model
+        self.predict_batch = loan_model.predict_batch
+        self.model = model
+        self.model.eval()
+
+    def predict(self, features, chunk_size=4096):
+        return self.predict_batch(self.model, features, chunk_size=chunk_size)
+
+class TorchScriptBackend:
+    name = 'torchscript'
+
+    def __init__(self, path):
+        import torch
+        self.torch = torch
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', FutureWarning)
+            self.module = torch.jit.load(path)
+        self.module.eval()
+
+    def predict(self, features, chunk_size=4096):
+        if len(features) == 0:
+            return []
+        probs = []
+        with self.torch.inference_mode():
+            inputs = self.torch.from_numpy(np.ascontiguousarray(features, dtype=np.float32))
+            for start in range(0, len(inputs), chunk_size):
+                probs.extend(self.module(inputs[start:start + chunk_size]).squeeze(1).tolist())
+        return probs
+
+class OnnxBackend:
+    name = 'onnx'
+
+    def __init__(self, path):
+        import onnxruntime # Optional dependency, only needed for this backend
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = 1 # The network is tiny; threads cost more than they save
+        self.session = onnxruntime.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+
+    def predict(self, features, chunk_size=4096):
+        if len(features) == 0:
+            return []
+        inputs = np.ascontiguousarray(features, dtype=np.float32)
+        probs = []
+        for start in range(0, len(inputs), chunk_size):
+            output = self.session.run(None, {ONNX_INPUT: inputs[start:start + chunk_size]})[0]
+            probs.extend(output[:, 0].tolist())
+        return probs
+
+def load_backend(name, version_dir, model=None):
+    # model: the eager LoanNet for this version, if already loaded
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{name}' (expected one of {', '.join(BACKENDS)})")
+    if name == 'eager':
+        return EagerBackend(model if model is not None else load_eager_model(version_dir))
+
+    path = os.path.join(version_dir, ARTIFACT_FILES[name])
+    if not os.path.exists(path):
+        # Versions published before the export step get their artifact on first use (this start imports torch)
+        if name == 'numpy' and model is None:
+            numpy_inference.convert_weights(os.path.join(version_dir, 'model.pth'), path)
+        else:
+            EXPORTERS[name](model if model is not None else load_eager_model(version_dir), path)
+    if name == 'numpy':
+        return NumpyBackend(path)
+    return TorchScriptBackend(path) if name == 'torchscript' else OnnxBackend(path)
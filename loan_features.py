@@ -0,0 +1,66 @@
+import numpy as np
+from decimal import Decimal
+
+# Featurization for LoanNet, kept free of torch so the Prediction Agent can score with the
+# NumPy backend without importing it (see inference_backends.py). loan_model re-exports all of this.
+
+# Feature Schema (model input order) and Normalization Constants
+# Each feature is scaled as min(value / scale, cap)
+FEATURE_COLUMNS = ['AnnualIncome', 'CreditScore', 'ExistingDebt', 'DebtToIncomeRatio', 'CollateralValue',
+                   'AccountAgeDays', 'AvgTransactionCount', 'ProcessingPriority', 'LoyaltyPoints']
+FEATURE_SCALES = np.array([3000000.0, 900.0, 1000000.0, 1.0, 5000000.0, 5000.0, 100.0, 10.0, 5000.0])
+FEATURE_CAPS = np.array([1.0, np.inf, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0]) # Credit Score is not capped
+
+def run_float(val):
+    if isinstance(val, Decimal):
+        return float(val)
+    if val is None:
+        return 0.0
+    return float(val)
+
+def prepare_features(row):
+    # Extracts features from a raw DB row
+    # Row expected: [Income, CreditScore, Debt, DTI, Collateral, AccountAge, AvgTrans, Priority, Loyalty]
+    
+    # 1. Core Financial Features (Signal)
+    annual_income = run_float(row[0])
+    credit_score = float(row[1]) if row[1] else 0.0
+    existing_debt = run_float(row[2])
+    dti = run_float(row[3])
+    collateral = run_float(row[4])
+    
+    # 2. Noise Features (The agent should learn to ignore these)
+    account_age_days = float(row[5]) if row[5] else 0.0
+    avg_trans_count = float(row[6]) if row[6] else 0.0
+    processing_priority = float(row[7]) if row[7] else 0.0
+    loyalty_points = float(row[8]) if row[8] else 0.0
+
+    # Normalization (Scaling to 0-1 range approx)
+    norm_income = min(annual_income / 3000000.0, 1.0) 
+    norm_score = credit_score / 900.0
+    norm_debt = min(existing_debt / 1000000.0, 1.0)
+    norm_dti = min(dti / 1.0, 1.0) # DTI > 1 is rare/bad
+    norm_collateral = min(collateral / 5000000.0, 1.0)
+    
+    # Noise Normalization
+    norm_account_age = min(account_age_days / 5000.0, 1.0)
+    norm_avg_trans = min(avg_trans_count / 100.0, 1.0)
+    norm_priority = min(processing_priority / 10.0, 1.0)
+    norm_loyalty = min(loyalty_points / 5000.0, 1.0)
+    
+    return [norm_income, norm_score, norm_debt, norm_dti, norm_collateral,
+            norm_account_age, norm_avg_trans, norm_priority, norm_loyalty]
+
+def rows_to_array(rows, start, stop):
+    # Columnar conversion of DB rows (Decimals / ints / NULLs) to a float64 matrix of row[start:stop]
+    width = stop - start
+    raw = np.array([r[start:stop] for r in rows], dtype=object).reshape(len(rows), width)
+    raw[raw == None] = 0
+    return raw.astype(np.float64)
+
+def prepare_features_batch(rows, start=0):
+    # Columnar version of prepare_features for a whole result set.
+    # Reads the 9 feature columns beginning at row[start] and returns a contiguous
+    # float32 [N, 9] array, ready for torch.from_numpy without another copy.
+    raw = rows_to_array(rows, start, start + len(FEATURE_COLUMNS))
+    return np.ascontiguousarray(np.minimum(raw / FEATURE_SCALES, FEATURE_CAPS), dtype=np.float32)
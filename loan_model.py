@@ -1,8 +1,12 @@
+import numpy as np
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from torch.utils.data import Dataset, DataLoader
-from decimal import Decimal
+from torch.utils.data import Dataset, IterableDataset, DataLoader
+
+# Feature schema and featurization live in loan_features.py (no torch import); re-exported here
+from loan_features import (FEATURE_COLUMNS, FEATURE_SCALES, FEATURE_CAPS, run_float, prepare_features,
+                           rows_to_array, prepare_features_batch)
 
 # Define the Feed-Forward Neural Network
 class LoanNet(nn.Module):
@@ -26,8 +30,9 @@ class LoanNet(nn.Module):
 
 class LoanDataset(Dataset):
     def __init__(self, features, labels):
-        self.features = torch.tensor(features, dtype=torch.float32)
-        self.labels = torch.tensor(labels, dtype=torch.float32).unsqueeze(1) # [N, 1]
+        # Zero-copy when given contiguous float32 arrays (see prepare_features_batch)
+        self.features = torch.from_numpy(np.ascontiguousarray(features, dtype=np.float32))
+        self.labels = torch.from_numpy(np.ascontiguousarray(labels, dtype=np.float32)).unsqueeze(1) # [N, 1]
 
     def __len__(self):
         return len(self.features)
@@ -35,45 +40,41 @@ class LoanDataset(Dataset):
     def __getitem__(self, idx):
         return self.features[idx], self.labels[idx]
 
-def run_float(val):
-    if isinstance(val, Decimal):
-        return float(val)
-    if val is None:
-        return 0.0
-    return float(val)
+class ChunkShuffleDataset(IterableDataset):
+    # Out-of-core version of LoanDataset.
+    # chunk_source() is called once per epoch and yields (features [n, 9], labels [n]) numpy chunks,
+    # e.g. from a server-side cursor. Rows are shuffled within a window of shuffle_chunks chunks,
+    # so memory is bounded by the window instead of growing with the training history.
+    # Yields ready-made (features, labels) batches; iterate it directly or via DataLoader(batch_size=None).
+    def __init__(self, chunk_source, batch_size=64, shuffle_chunks=8, seed=0):
+        self.chunk_source = chunk_source
+        self.batch_size = batch_size
+        self.shuffle_chunks = shuffle_chunks
+        self.seed = seed
+        self.epoch = 0
 
-def prepare_features(row):
-    # Extracts features from a raw DB row
-    # Row expected: [Income, CreditScore, Debt, DTI, Collateral, AccountAge, AvgTrans, Priority, Loyalty]
-    
-    # 1. Core Financial Features (Signal)
-    annual_income = run_float(row[0])
-    credit_score = float(row[1]) if row[1] else 0.0
-    existing_debt = run_float(row[2])
-    dti = run_float(row[3])
-    collateral = run_float(row[4])
-    
-    # 2. Noise Features (The agent should learn to ignore these)
-    account_age_days = float(row[5]) if row[5] else 0.0
-    avg_trans_count = float(row[6]) if row[6] else 0.0
-    processing_priority = float(row[7]) if row[7] else 0.0
-    loyalty_points = float(row[8]) if row[8] else 0.0
+    def __iter__(self):
+        # A different (but reproducible) shuffle every epoch
+        rng = np.random.default_rng([self.seed, self.epoch])
+        self.epoch += 1
+        window = []
+        for chunk in self.chunk_source():
+            if len(chunk[1]):
+                window.append(chunk)
+            if len(window) >= self.shuffle_chunks:
+                yield from self._shuffled_batches(window, rng)
+                window = []
+        if window:
+            yield from self._shuffled_batches(window, rng)
 
-    # Normalization (Scaling to 0-1 range approx)
-    norm_income = min(annual_income / 3000000.0, 1.0) 
-    norm_score = credit_score / 900.0
-    norm_debt = min(existing_debt / 1000000.0, 1.0)
-    norm_dti = min(dti / 1.0, 1.0) # DTI > 1 is rare/bad
-    norm_collateral = min(collateral / 5000000.0, 1.0)
-    
-    # Noise Normalization
-    norm_account_age = min(account_age_days / 5000.0, 1.0)
-    norm_avg_trans = min(avg_trans_count / 100.0, 1.0)
-    norm_priority = min(processing_priority / 10.0, 1.0)
-    norm_loyalty = min(loyalty_points / 5000.0, 1.0)
-    
-    return [norm_income, norm_score, norm_debt, norm_dti, norm_collateral,
-            norm_account_age, norm_avg_trans, norm_priority, norm_loyalty]
+    def _shuffled_batches(self, window, rng):
+        features = np.concatenate([np.asarray(f, dtype=np.float32) for f, _ in window])
+        labels = np.concatenate([np.asarray(l, dtype=np.float32) for _, l in window])
+        order = rng.permutation(len(labels))
+        features = torch.from_numpy(np.ascontiguousarray(features[order]))
+        labels = torch.from_numpy(np.ascontiguousarray(labels[order])).unsqueeze(1) # [N, 1]
+        for start in range(0, len(labels), self.batch_size):
+            yield features[start:start + self.batch_size], labels[start:start + self.batch_size]
 
 def train_model(features, labels, epochs=5):
     print("Initializing training...")
@@ -98,6 +99,29 @@ def train_model(features, labels, epochs=5):
         
     return model
 
+def train_model_stream(dataset, epochs=5):
+    # Same training loop as train_model, fed by a ChunkShuffleDataset (one pass over the source per epoch)
+    print("Initializing streaming training...")
+    model = LoanNet()
+    criterion = nn.BCELoss() # Binary Cross Entropy for Probability
+    optimizer = optim.Adam(model.parameters(), lr=0.001)
+    
+    for epoch in range(epochs):
+        total_loss = 0
+        batches = 0
+        for batch_features, batch_labels in dataset:
+            optimizer.zero_grad()
+            outputs = model(batch_features)
+            loss = criterion(outputs, batch_labels)
+            loss.backward()
+            optimizer.step()
+            total_loss += loss.item()
+            batches += 1
+            
+        print(f"Epoch {epoch+1}/{epochs}, Loss: {total_loss/max(batches, 1):.4f}")
+        
+    return model
+
 def predict_single(model, feature_vector):
     # Inference
     model.eval()
@@ -105,3 +129,18 @@ def predict_single(model, feature_vector):
         inputs = torch.tensor([feature_vector], dtype=torch.float32)
         output = model(inputs)
         return output.item()
+
+def predict_batch(model, features, chunk_size=4096):
+    # Batched Inference: one forward pass per chunk of an N x 9 feature matrix
+    # instead of one tiny tensor per application
+    if len(features) == 0:
+        return []
+
+    model.eval()
+    probs = []
+    with torch.no_grad():
+        inputs = torch.as_tensor(np.asarray(features, dtype=np.float32))
+        for start in range(0, len(inputs), chunk_size):
+            output = model(inputs[start:start + chunk_size])
+            probs.extend(output.squeeze(1).tolist())
+    return probs
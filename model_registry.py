@@ -0,0 +1,186 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+import numpy as np
+import loan_features
+import inference_backends
+
+# On-disk Model Registry
+# <MODEL_REGISTRY_DIR>/
+#     versions/<version>/model.pth       weights (LoanNet state_dict)
+#     versions/<version>/metadata.json   feature schema, normalization constants, training metrics
+#     versions/<version>/model.npz|.ts|.onnx  exports for the faster inference backends (inference_backends.py)
+#     PROMOTED                           id of the version predictors should serve
+# Published versions never change; promoting is an atomic swap of the PROMOTED pointer (os.replace),
+# so a predictor never reads a half-written model.
+# Serving with the numpy backend never imports torch; publishing and the eager backend do (lazily).
+REGISTRY_DIR = os.environ.get('MODEL_REGISTRY_DIR', 'model_registry')
+LEGACY_MODEL_PATH = "loan_model.pth" # Single-file model from before the registry, imported once
+WATCH_INTERVAL = 5 # Seconds between checks of the PROMOTED pointer
+WEIGHTS_FILE = 'model.pth'
+METADATA_FILE = 'metadata.json'
+PROMOTED_FILE = 'PROMOTED'
+
+def versions_dir(registry_dir=REGISTRY_DIR):
+    return os.path.join(registry_dir, 'versions')
+
+def version_dir(version, registry_dir=REGISTRY_DIR):
+    return os.path.join(versions_dir(registry_dir), version)
+
+def feature_schema():
+    # The input contract the weights are trained against (uncapped features stored as null)
+    return {
+        'columns': list(loan_features.FEATURE_COLUMNS),
+        'scales': [float(scale) for scale in loan_features.FEATURE_SCALES],
+        'caps': [None if np.isinf(cap) else float(cap) for cap in loan_features.FEATURE_CAPS],
+    }
+
+def publish(model, metrics=None, source='', registry_dir=REGISTRY_DIR, promote=True):
+    # Stores a new immutable version and (by default) promotes it. Returns the version id.
+    import torch
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    weights = buffer.getvalue()
+    created = datetime.now(timezone.utc)
+    version = f"{created:%Y%m%d-%H%M%S}-{hashlib.sha256(weights).hexdigest()[:8]}"
+    metadata = {
+        'version': version,
+        'created_at': created.isoformat(),
+        'source': source,
+        'feature_schema': feature_schema(),
+        'metrics': metrics or {},
+    }
+
+    # Written into a hidden temp dir and renamed into place, so versions/ only ever holds complete versions
+    os.makedirs(versions_dir(registry_dir), exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.staging-', dir=versions_dir(registry_dir))
+    try:
+        with open(os.path.join(staging, WEIGHTS_FILE), 'wb') as f:
+            f.write(weights)
+        with open(os.path.join(staging, METADATA_FILE), 'w') as f:
+            json.dump(metadata, f, indent=2)
+        inference_backends.export_artifacts(model, staging)
+        os.replace(staging, version_dir(version, registry_dir))
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    print(f"Published model {version}")
+    if promote:
+        promote_version(version, registry_dir)
+    return version
+
+def promote_version(version, registry_dir=REGISTRY_DIR):
+    if not os.path.isdir(version_dir(version, registry_dir)):
+        raise ValueError(f"Unknown model version {version}")
+    pointer = os.path.join(registry_dir, PROMOTED_FILE)
+    staging = f"{pointer}.{os.getpid()}.tmp"
+    with open(staging, 'w') as f:
+        f.write(version + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(staging, pointer)
+    print(f"Promoted model {version}")
+
+def promoted_version(registry_dir=REGISTRY_DIR):
+    try:
+        with open(os.path.join(registry_dir, PROMOTED_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def list_versions(registry_dir=REGISTRY_DIR):
+    if not os.path.isdir(versions_dir(registry_dir)):
+        return []
+    return sorted(v for v in os.listdir(versions_dir(registry_dir)) if not v.startswith('.'))
+
+def load_metadata(version, registry_dir=REGISTRY_DIR):
+    with open(os.path.join(version_dir(version, registry_dir), METADATA_FILE)) as f:
+        return json.load(f)
+
+def load_checked_metadata(version, registry_dir=REGISTRY_DIR):
+    # Refuses weights trained on a different feature schema,
+    # since the current featurization would feed them the wrong inputs.
+    metadata = load_metadata(version, registry_dir)
+    if metadata.get('feature_schema') != feature_schema():
+        raise ValueError(f"Model {version} was trained on a different feature schema")
+    return metadata
+
+def load_model(version, registry_dir=REGISTRY_DIR):
+    # Returns (eager LoanNet, metadata)
+    metadata = load_checked_metadata(version, registry_dir)
+    return inference_backends.load_eager_model(version_dir(version, registry_dir)), metadata
+
+def import_legacy_model(path=LEGACY_MODEL_PATH, registry_dir=REGISTRY_DIR):
+    # Existing deployments keep their trained model: a loan_model.pth is published once
+    # if nothing has been promoted yet
+    if promoted_version(registry_dir) or not os.path.exists(path):
+        return None
+    print(f"Importing existing model from {path} into the registry...")
+    import torch
+    import loan_model
+    model = loan_model.LoanNet()
+    model.load_state_dict(torch.load(path))
+    return publish(model, source=f"imported from {path}", registry_dir=registry_dir)
+
+class ModelWatcher:
+    # Serves the promoted model and picks up newly promoted versions.
+    # poll() is cheap (one stat every WATCH_INTERVAL seconds); callers check between batches
+    # and read .scorer / .version together, so a page is always scored by a single version.
+    # .scorer is the version loaded into the chosen inference backend.
+    def __init__(self, registry_dir=REGISTRY_DIR, interval=WATCH_INTERVAL, backend=inference_backends.DEFAULT_BACKEND):
+        self.registry_dir = registry_dir
+        self.interval = interval
+        self.backend = backend
+        self.scorer = None
+        self.version = None
+        self.metadata = None
+        self._last_check = 0
+        self._pointer_stamp = None
+
+    def poll(self, force=False):
+        # Returns True if a new model was swapped in
+        now = time.monotonic()
+        if not force and now - self._last_check < self.interval:
+            return False
+        self._last_check = now
+
+        try:
+            info = os.stat(os.path.join(self.registry_dir, PROMOTED_FILE))
+        except FileNotFoundError:
+            return False
+        stamp = (info.st_mtime_ns, info.st_size, info.st_ino)
+        if stamp == self._pointer_stamp and not force:
+            return False
+        self._pointer_stamp = stamp
+
+        version = promoted_version(self.registry_dir)
+        if version is None or version == self.version:
+            return False
+        try:
+            metadata = load_checked_metadata(version, self.registry_dir)
+            scorer = inference_backends.load_backend(self.backend, version_dir(version, self.registry_dir))
+        except Exception as e:
+            print(f"Could not load promoted model {version}, keeping {self.version}: {e}")
+            return False
+
+        self.scorer, self.version, self.metadata = scorer, version, metadata
+        print(f"Serving model {version} ({self.backend} backend)")
+        return True
+
+if __name__ == '__main__':
+    # Minimal CLI: list versions, or promote one (rollback = promote an older version)
+    import sys
+    if len(sys.argv) == 3 and sys.argv[1] == 'promote':
+        promote_version(sys.argv[2])
+    else:
+        current = promoted_version()
+        for version in list_versions():
+            metrics = load_metadata(version).get('metrics', {})
+            marker = '*' if version == current else ' '
+            print(f"{marker} {version}  {json.dumps(metrics)}")
@@ -0,0 +1,61 @@
+import os
+import numpy as np
+
+# Pure-NumPy LoanNet (9 -> 64 -> 32 -> 1) for scoring without importing torch.
+# Weights come from model.pth, converted once to a compact .npz:
+#     w1 [9, 64]  b1 [64]  w2 [64, 32]  b2 [32]  w3 [32, 1]  b3 [1]   (float32)
+# The weights are stored pre-transposed (x @ w), so a forward pass is three matmuls.
+# Outputs match the torch model within float32 rounding (checked by verify_execution.py).
+LAYERS = (('w1', 'b1', 'fc1'), ('w2', 'b2', 'fc2'), ('w3', 'b3', 'fc3'))
+
+def state_dict_to_arrays(state_dict):
+    # LoanNet state_dict (torch tensors or arrays) -> {w1, b1, ...} float32 arrays
+    arrays = {}
+    for w, b, layer in LAYERS:
+        weight = state_dict[f"{layer}.weight"]
+        bias = state_dict[f"{layer}.bias"]
+        if hasattr(weight, 'detach'):
+            weight, bias = weight.detach().cpu().numpy(), bias.detach().cpu().numpy()
+        arrays[w] = np.ascontiguousarray(np.asarray(weight, dtype=np.float32).T) # nn.Linear stores [out, in]
+        arrays[b] = np.asarray(bias, dtype=np.float32)
+    return arrays
+
+def save_npz(state_dict, path):
+    # Written to a temp file and renamed, like every other registry artifact
+    staging = f"{path}.{os.getpid()}.tmp.npz" # np.savez appends .npz to names without it
+    np.savez(staging, **state_dict_to_arrays(state_dict))
+    os.replace(staging, path)
+
+def convert_weights(pth_path, npz_path):
+    # The one step that needs torch (lazy import); later starts read the .npz directly
+    import torch
+    save_npz(torch.load(pth_path, map_location='cpu'), npz_path)
+
+class NumpyLoanNet:
+    def __init__(self, arrays):
+        self.w1, self.b1 = arrays['w1'], arrays['b1']
+        self.w2, self.b2 = arrays['w2'], arrays['b2']
+        self.w3, self.b3 = arrays['w3'], arrays['b3']
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls({name: np.ascontiguousarray(data[name], dtype=np.float32) for name in data.files})
+
+    def forward(self, x):
+        # x: float32 [N, 9] -> probabilities float32 [N]
+        out = np.maximum(x @ self.w1 + self.b1, 0)
+        out = np.maximum(out @ self.w2 + self.b2, 0)
+        out = (out @ self.w3 + self.b3)[:, 0]
+        with np.errstate(over='ignore'): # exp overflow -> inf -> probability 0, same as torch.sigmoid
+            return 1.0 / (1.0 + np.exp(-out))
+
+    def predict(self, features, chunk_size=4096):
+        # Same contract as loan_model.predict_batch: a list of probabilities
+        if len(features) == 0:
+            return []
+        inputs = np.ascontiguousarray(features, dtype=np.float32)
+        probs = []
+        for start in range(0, len(inputs), chunk_size):
+            probs.extend(self.forward(inputs[start:start + chunk_size]).tolist())
+        return probs
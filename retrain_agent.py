@@ -0,0 +1,197 @@
+import os
+import sys
+import time
+import numpy as np
+import torch
+import db_config
+import loan_model
+import model_registry
+import agent_predictor
+import feature_store
+
+# Retraining Agent: runs beside the Prediction Agent, never inside it.
+# Periodically rebuilds a training set from decided applications, labels it with the
+# Rule-Based Teacher, trains in this process and publishes to the model registry only if the
+# candidate passes on a held-out slice. Predictors pick the new version up between pages.
+RETRAIN_INTERVAL = int(os.environ.get('RETRAIN_INTERVAL', 1800)) # Seconds between runs
+RETRAIN_EPOCHS = int(os.environ.get('RETRAIN_EPOCHS', 10))
+RETRAIN_MAX_ROWS = int(os.environ.get('RETRAIN_MAX_ROWS', 0)) # Most recent decided applications, 0 = full history
+TRAINING_CHUNK_ROWS = int(os.environ.get('TRAINING_CHUNK_ROWS', 20000)) # Rows per server-side cursor fetch
+SHUFFLE_CHUNKS = 8 # Chunks shuffled together; memory stays at about SHUFFLE_CHUNKS * TRAINING_CHUNK_ROWS rows
+# 'db' streams from Postgres every epoch; 'store' refreshes the local feature store (one incremental
+# export per cycle) and trains from its memory-mapped shards (RETRAIN_MAX_ROWS does not apply)
+TRAINING_SOURCE = os.environ.get('TRAINING_SOURCE', 'db')
+RETRAIN_MIN_ROWS = 100 # Same floor the in-line bootstrap used
+RETRAIN_MIN_NEW_DECISIONS = int(os.environ.get('RETRAIN_MIN_NEW_DECISIONS', 1000)) # Skip runs with little new history
+RETRAIN_MIN_ACCURACY = float(os.environ.get('RETRAIN_MIN_ACCURACY', 0.90)) # Held-out agreement with the teacher
+RETRAIN_THREADS = int(os.environ.get('RETRAIN_THREADS', 1)) # Keep CPU free for serving
+HOLDOUT_MODULUS = 5 # ApplicationID % 5 == 0 is held out (20%), stable across runs
+
+# Training data is streamed: chunks from a server-side cursor go through loan_model.ChunkShuffleDataset,
+# so memory stays flat however long the history gets.
+
+# Decided applications in the claim-row layout (AppID, ReqAmount, Income, Score, Debt, DTI, Collateral,
+# AccountAge, AvgTrans, Priority, Loyalty), so the predictor's featurization and teacher apply unchanged
+TRAINING_ROWS_QUERY = """
+    SELECT LA.ApplicationID, LA.RequestAmount,
+           FP.AnnualIncome, FP.CreditScore, FP.ExistingDebt, FP.DebtToIncomeRatio, FP.CollateralValue,
+           FP.AccountAgeDays, FP.AvgTransactionCount, LA.ProcessingPriority, A.LoyaltyPoints
+    FROM LoanApplications LA
+    JOIN Applicants A ON LA.ApplicantID = A.ApplicantID
+    JOIN FinancialProfile FP ON A.ApplicantID = FP.ApplicantID
+    WHERE LA.Status IN ('Approved', 'Rejected')
+    ORDER BY LA.ApplicationID DESC
+    LIMIT %s
+"""
+
+DECIDED_COUNT_QUERY = "SELECT COUNT(*) FROM LoanApplications WHERE Status IN ('Approved', 'Rejected')"
+
+def prediction_watermark(cursor):
+    cursor.execute("SELECT COALESCE(MAX(PredictionID), 0) FROM Predictions")
+    return cursor.fetchone()[0]
+
+def new_decisions_since(cursor, watermark):
+    cursor.execute("SELECT COUNT(*) FROM Predictions WHERE PredictionID > %s", (watermark,))
+    return cursor.fetchone()[0]
+
+def label_rows(rows):
+    # Returns (application ids, features, teacher labels) for a chunk of training rows.
+    # Labels come from the teacher, not from stored decisions: those may be earlier model output
+    labels = agent_predictor.teacher_labels(rows)
+    features = loan_model.prepare_features_batch(rows, start=2)
+    app_ids = np.array([row[0] for row in rows], dtype=np.int64)
+    return app_ids, features, labels
+
+def iter_training_chunks(conn, split, max_rows=RETRAIN_MAX_ROWS, chunk_rows=TRAINING_CHUNK_ROWS):
+    # Streams (features, labels) chunks of one split ('train' or 'holdout') through a named
+    # (server-side) cursor; only one chunk of rows is held in this process at a time
+    cursor = conn.cursor(name=f"training_{split}")
+    cursor.itersize = chunk_rows
+    try:
+        cursor.execute(TRAINING_ROWS_QUERY, (max_rows or None,)) # LIMIT NULL = no limit
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            app_ids, features, labels = label_rows(rows)
+            held_out = app_ids % HOLDOUT_MODULUS == 0
+            mask = held_out if split == 'holdout' else ~held_out
+            yield features[mask], labels[mask]
+    finally:
+        cursor.close()
+        conn.rollback() # Release the snapshot between passes
+
+def evaluate_stream(models, chunks):
+    # Held-out accuracy of each model (None entries are skipped) in a single pass over the chunks.
+    # Returns (accuracies, rows evaluated)
+    correct = [0] * len(models)
+    total = 0
+    for features, labels in chunks:
+        if not len(labels):
+            continue
+        total += len(labels)
+        for i, model in enumerate(models):
+            if model is not None:
+                probs = np.asarray(loan_model.predict_batch(model, features, chunk_size=agent_predictor.PREDICT_CHUNK_SIZE))
+                correct[i] += int(np.sum((probs > 0.5) == (labels > 0.5)))
+    accuracies = [correct[i] / total if total and model is not None else None for i, model in enumerate(models)]
+    return accuracies, total
+
+def current_model():
+    # (version, model) currently promoted, or (None, None)
+    version = model_registry.promoted_version()
+    if version is None:
+        return None, None
+    try:
+        return version, model_registry.load_model(version)[0]
+    except Exception as e:
+        print(f"Promoted model {version} unusable ({e}); any passing candidate replaces it.")
+        return version, None
+
+def retrain_once(conn, force=False):
+    # One retraining cycle. Returns the published version, or None.
+    cursor = conn.cursor()
+    version, model = current_model()
+    watermark = prediction_watermark(cursor)
+
+    if version and model is not None and not force:
+        trained_at = model_registry.load_metadata(version).get('metrics', {}).get('prediction_watermark', 0)
+        fresh = new_decisions_since(cursor, trained_at)
+        if fresh < RETRAIN_MIN_NEW_DECISIONS:
+            print(f"Only {fresh} new decisions since {version} (need {RETRAIN_MIN_NEW_DECISIONS}). Skipping.")
+            return None
+
+    if TRAINING_SOURCE == 'store':
+        feature_store.export(conn)
+        decided = feature_store.stats()['live_rows']
+        chunk_source = lambda split: feature_store.iter_chunks(split, chunk_rows=TRAINING_CHUNK_ROWS,
+                                                               holdout_modulus=HOLDOUT_MODULUS)
+    else:
+        cursor.execute(DECIDED_COUNT_QUERY)
+        decided = cursor.fetchone()[0]
+        conn.rollback()
+        if RETRAIN_MAX_ROWS:
+            decided = min(decided, RETRAIN_MAX_ROWS)
+        chunk_source = lambda split: iter_training_chunks(conn, split)
+    if decided < RETRAIN_MIN_ROWS:
+        print(f"Not enough decided applications to train (have {decided}, need {RETRAIN_MIN_ROWS}).")
+        return None
+
+    print(f"Streaming {decided} decided applications from {TRAINING_SOURCE} ({TRAINING_CHUNK_ROWS} rows per chunk)...")
+    started = time.time()
+    dataset = loan_model.ChunkShuffleDataset(lambda: chunk_source('train'), shuffle_chunks=SHUFFLE_CHUNKS, seed=watermark)
+    candidate = loan_model.train_model_stream(dataset, epochs=RETRAIN_EPOCHS)
+    (accuracy, baseline), holdout_rows = evaluate_stream([candidate, model], chunk_source('holdout'))
+    if not holdout_rows or holdout_rows == decided:
+        print("Training set too small to hold out a slice. Skipping.")
+        return None
+    print(f"Candidate held-out accuracy {accuracy:.4f}" +
+          (f" (promoted {version}: {baseline:.4f})" if baseline is not None else "") +
+          f", trained in {time.time() - started:.1f}s")
+
+    # Gate: good enough on its own, and no worse than what is serving now
+    if accuracy < RETRAIN_MIN_ACCURACY:
+        print(f"Rejected: below the {RETRAIN_MIN_ACCURACY} accuracy floor. Not published.")
+        return None
+    if baseline is not None and accuracy < baseline:
+        print("Rejected: worse than the promoted model. Not published.")
+        return None
+
+    metrics = {
+        'train_rows': int(decided - holdout_rows),
+        'holdout_rows': int(holdout_rows),
+        'epochs': RETRAIN_EPOCHS,
+        'holdout_accuracy': accuracy,
+        'baseline_version': version,
+        'baseline_accuracy': baseline,
+        'prediction_watermark': int(watermark),
+    }
+    return model_registry.publish(candidate, metrics, source='retrain_agent')
+
+def main():
+    print("Starting Retraining Agent...")
+    once = '--once' in sys.argv
+    force = '--force' in sys.argv
+
+    # Training competes with predictors for CPU: fewer threads and a lower priority
+    torch.set_num_threads(RETRAIN_THREADS)
+    if hasattr(os, 'nice'):
+        os.nice(10)
+
+    while True:
+        with db_config.connection() as conn:
+            if not conn:
+                print("Database unavailable.")
+            else:
+                try:
+                    retrain_once(conn, force)
+                except Exception as e:
+                    print(f"Retraining failed: {e}")
+
+        if once:
+            break
+        print(f"Next retraining check in {RETRAIN_INTERVAL} seconds...")
+        time.sleep(RETRAIN_INTERVAL)
+
+if __name__ == "__main__":
+    main()
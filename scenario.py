@@ -0,0 +1,198 @@
+import db_config
+import generate_data
+from faker import Faker
+import argparse
+import hashlib
+import json
+import random
+import sys
+import time
+
+# Seeded load-test scenarios.
+# A scenario is a fixed seed plus a handful of knobs; the same knobs always produce the
+# same applicant / financial / loan stream, so predictor throughput can be compared across builds.
+# Streams can be written to JSONL (one event per line) and replayed into the DB later.
+
+SCENARIO_VERSION = 1
+DEFAULT_SEED = 42
+DEFAULT_POPULATION = generate_data.INITIAL_POPULATION # Applicants present before day 1
+DEFAULT_DAYS = 10
+DEFAULT_ARRIVAL_RATE = generate_data.BATCH_SIZE # New applicants per simulated day
+DEFAULT_UPDATE_RATE = 3.5 # Life events per simulated day (the live simulator draws 2-5)
+UPDATE_EMPLOYMENT_CHANGE = 0.1 # Same 10% chance as update_existing_applicant
+REPLAY_BATCH_SIZE = 10000 # Applicants per COPY while replaying
+
+def parse_employment_mix(text):
+    # "Salaried=60,Unemployed=10" -> weights aligned with EMPLOYMENT_STATUSES (missing statuses get 0)
+    if not text:
+        return None
+    weights = dict.fromkeys(generate_data.EMPLOYMENT_STATUSES, 0.0)
+    for part in text.split(','):
+        name, _, value = part.partition('=')
+        name = name.strip()
+        if name not in weights:
+            raise ValueError(f"Unknown employment status '{name}' (expected one of {generate_data.EMPLOYMENT_STATUSES})")
+        weights[name] = float(value)
+    if sum(weights.values()) <= 0:
+        raise ValueError("Employment mix needs at least one positive weight")
+    return [weights[status] for status in generate_data.EMPLOYMENT_STATUSES]
+
+def daily_count(rng, rate):
+    # Whole part every day, fractional part as a coin flip (a rate of 3.5 averages 3.5/day)
+    whole = int(rate)
+    return whole + (1 if rng.random() < rate - whole else 0)
+
+def iter_scenario_events(seed=DEFAULT_SEED, population=DEFAULT_POPULATION, days=DEFAULT_DAYS,
+                         arrival_rate=DEFAULT_ARRIVAL_RATE, update_rate=DEFAULT_UPDATE_RATE, employment_mix=None):
+    # Everything is drawn from one private Random + Faker pair, never the module globals.
+    # Each gets its own seed derived from the master seed (one shared seed would give both the same stream).
+    rng = random.Random(f"{seed}:rng")
+    faker = Faker('en_IN')
+    faker.seed_instance(f"{seed}:faker")
+
+    yield {'type': 'scenario', 'version': SCENARIO_VERSION, 'seed': seed, 'population': population, 'days': days,
+           'arrival_rate': arrival_rate, 'update_rate': update_rate, 'employment_mix': employment_mix}
+
+    # Current employment status per applicant ordinal (updates draw financials from it)
+    employment = []
+
+    def arrival(day):
+        app_data, fin_data, loan_data = generate_data.generate_record(rng, faker, employment_mix)
+        employment.append(app_data['EmploymentStatus'])
+        return {'type': 'applicant', 'day': day, 'ordinal': len(employment) - 1,
+                'applicant': app_data, 'financials': fin_data, 'loan': loan_data}
+
+    for _ in range(population):
+        yield arrival(0)
+
+    for day in range(1, days + 1):
+        # 1. Morning batch
+        for _ in range(daily_count(rng, arrival_rate)):
+            yield arrival(day)
+
+        # 2. Afternoon life events, addressed by ordinal since ApplicantIDs only exist after replay
+        if not employment:
+            continue
+        for _ in range(daily_count(rng, update_rate)):
+            target = rng.randrange(len(employment))
+            new_status = None
+            if rng.random() < UPDATE_EMPLOYMENT_CHANGE:
+                new_status = generate_data.pick_employment_status(rng, employment_mix)
+                employment[target] = new_status
+            fin_data = generate_data.generate_financials(employment[target], rng, faker)
+            loan_data = generate_data.generate_loan_request(fin_data['AnnualIncome'], fin_data['CollateralValue'], rng, faker)
+            yield {'type': 'update', 'day': day, 'target': target, 'employment': new_status, 'financials': fin_data,
+                   'loan': {'RequestAmount': loan_data['RequestAmount'], 'LoanToCostRatio': loan_data['LoanToCostRatio']}}
+
+def write_scenario(path, events):
+    # Returns (event count, sha256 of the file) - equal digests mean equal scenarios
+    digest = hashlib.sha256()
+    count = 0
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        for event in events:
+            line = json.dumps(event, ensure_ascii=False) + '\n'
+            f.write(line)
+            digest.update(line.encode('utf-8'))
+            count += 1
+    return count, digest.hexdigest()
+
+def read_scenario(path):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def replay_scenario(conn, events, day_delay=0):
+    # Applies a scenario to the DB: arrivals via COPY, a day's life events as one set-based batch.
+    # Commits once per simulated day so the predictor sees the same day-sized bursts as main().
+    cursor = conn.cursor()
+    applicant_ids = [] # ordinal -> ApplicantID
+    pending = []
+    life_events = []
+    current_day = 0
+    updates = 0
+
+    def flush():
+        if pending:
+            applicant_ids.extend(generate_data.copy_records(cursor, pending))
+            pending.clear()
+
+    def end_day():
+        # Arrivals first: the day's updates may target applicants who arrived that morning
+        flush()
+        generate_data.apply_life_events(cursor, [(applicant_ids[target], new_status, fin_data, loan_data)
+                                                 for target, new_status, fin_data, loan_data in life_events])
+        life_events.clear()
+        conn.commit()
+        print(f"Replayed day {current_day}: {len(applicant_ids)} applicants, {updates} updates so far")
+
+    for event in events:
+        if event['type'] == 'scenario':
+            if event['version'] != SCENARIO_VERSION:
+                raise ValueError(f"Scenario version {event['version']} is not supported (expected {SCENARIO_VERSION})")
+            print(f"--- REPLAYING SCENARIO (seed {event['seed']}, population {event['population']}, {event['days']} days) ---")
+            continue
+
+        if event['day'] != current_day:
+            end_day()
+            current_day = event['day']
+            if day_delay:
+                time.sleep(day_delay)
+
+        if event['type'] == 'applicant':
+            pending.append((event['applicant'], event['financials'], event['loan']))
+            if len(pending) >= REPLAY_BATCH_SIZE:
+                flush()
+        elif event['type'] == 'update':
+            life_events.append((event['target'], event['employment'], event['financials'], event['loan']))
+            updates += 1
+
+    end_day()
+    print("--- SCENARIO REPLAY COMPLETE ---")
+
+def add_scenario_arguments(parser):
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--population', type=int, default=DEFAULT_POPULATION, help="Applicants before day 1")
+    parser.add_argument('--days', type=int, default=DEFAULT_DAYS)
+    parser.add_argument('--arrival-rate', type=float, default=DEFAULT_ARRIVAL_RATE, help="New applicants per day")
+    parser.add_argument('--update-rate', type=float, default=DEFAULT_UPDATE_RATE, help="Life events per day")
+    parser.add_argument('--employment-mix', default=None,
+                        help="Weights such as 'Salaried=60,Self-Employed=20,Unemployed=10,Retired=10' (default: uniform)")
+
+def scenario_events_from_args(args):
+    return iter_scenario_events(args.seed, args.population, args.days, args.arrival_rate, args.update_rate,
+                                parse_employment_mix(args.employment_mix))
+
+def replay_into_db(events, day_delay):
+    with db_config.connection() as conn:
+        if not conn:
+            print("Database unavailable.")
+            return 1
+        replay_scenario(conn, events, day_delay)
+    return 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Deterministic scenario generator for reproducible load tests.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate_cmd = commands.add_parser('generate', help="Write a scenario to a JSONL file")
+    add_scenario_arguments(generate_cmd)
+    generate_cmd.add_argument('--out', required=True)
+
+    replay_cmd = commands.add_parser('replay', help="Replay a JSONL scenario into the database")
+    replay_cmd.add_argument('path')
+    replay_cmd.add_argument('--day-delay', type=float, default=0, help="Seconds to wait between simulated days")
+
+    run_cmd = commands.add_parser('run', help="Generate a scenario and replay it directly, without a file")
+    add_scenario_arguments(run_cmd)
+    run_cmd.add_argument('--day-delay', type=float, default=0, help="Seconds to wait between simulated days")
+
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        count, digest = write_scenario(args.out, scenario_events_from_args(args))
+        print(f"Wrote {count} events to {args.out} (sha256 {digest})")
+    elif args.command == 'replay':
+        sys.exit(replay_into_db(read_scenario(args.path), args.day_delay))
+    else:
+        sys.exit(replay_into_db(scenario_events_from_args(args), args.day_delay))
@@ -45,7 +45,7 @@ CREATE TABLE IF NOT EXISTS LoanApplications (
     ReferralCode VARCHAR(50),        -- Noise
     ProcessingPriority INT,          -- Noise
     ApplicationDate TIMESTAMP DEFAULT NOW(),
-    Status VARCHAR(50) DEFAULT 'Pending' -- Pending, Approved, Rejected
+    Status VARCHAR(50) DEFAULT 'Pending' -- Pending, InProgress, Approved, Rejected
 );
 
 -- 4. Predictions Table (Agent Output)
@@ -58,3 +58,178 @@ CREATE TABLE IF NOT EXISTS Predictions (
     Reasoning TEXT,
     GeneratedAt TIMESTAMP DEFAULT NOW()
 );
+
+-- 5. Work Queue Claims (multiple Prediction Agents)
+-- A worker moves a Pending application to InProgress and owns it until LeaseExpiresAt.
+-- Expired leases are reclaimed by any worker.
+ALTER TABLE LoanApplications ADD COLUMN IF NOT EXISTS ClaimedBy VARCHAR(100);
+ALTER TABLE LoanApplications ADD COLUMN IF NOT EXISTS LeaseExpiresAt TIMESTAMP;
+
+-- 6. New Work Notifications (wake idle Prediction Agents via LISTEN loan_pending)
+-- The payload is constant so Postgres folds all notifications of one transaction into one.
+CREATE OR REPLACE FUNCTION notify_pending_application() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('loan_pending', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_loan_pending_insert ON LoanApplications;
+CREATE TRIGGER trg_loan_pending_insert
+    AFTER INSERT ON LoanApplications
+    FOR EACH ROW WHEN (NEW.Status = 'Pending')
+    EXECUTE FUNCTION notify_pending_application();
+
+DROP TRIGGER IF EXISTS trg_loan_pending_reset ON LoanApplications;
+CREATE TRIGGER trg_loan_pending_reset
+    AFTER UPDATE OF Status ON LoanApplications
+    FOR EACH ROW WHEN (NEW.Status = 'Pending' AND OLD.Status IS DISTINCT FROM 'Pending')
+    EXECUTE FUNCTION notify_pending_application();
+
+-- 7. Indexes for the hot queries (verify plans with check_query_plans.py)
+-- Work queue: the claim query walks only Pending rows, in ApplicationID order
+CREATE INDEX IF NOT EXISTS idx_loanapplications_pending
+    ON LoanApplications (ApplicationID) WHERE Status = 'Pending';
+-- Lease reclaim: only InProgress rows carry a lease
+CREATE INDEX IF NOT EXISTS idx_loanapplications_lease
+    ON LoanApplications (LeaseExpiresAt) WHERE Status = 'InProgress';
+-- Joins and generator updates by applicant
+CREATE INDEX IF NOT EXISTS idx_loanapplications_applicant ON LoanApplications (ApplicantID);
+CREATE INDEX IF NOT EXISTS idx_financialprofile_applicant ON FinancialProfile (ApplicantID);
+-- Latest prediction of an application (claim fingerprints, dashboard, LatestPredictions view):
+-- one index probe however many times the application was re-evaluated
+CREATE INDEX IF NOT EXISTS idx_predictions_application_latest ON Predictions (ApplicationID, PredictionID);
+DROP INDEX IF EXISTS idx_predictions_application; -- Superseded by the index above
+
+-- 8. Incremental Re-scoring
+-- Each prediction records the decision it led to and a fingerprint of its inputs + model version.
+-- A re-queued application with an unchanged fingerprint gets the last Decision back without inference.
+ALTER TABLE Predictions ADD COLUMN IF NOT EXISTS Decision VARCHAR(50); -- Approved, Rejected
+ALTER TABLE Predictions ADD COLUMN IF NOT EXISTS FeatureFingerprint VARCHAR(64);
+
+-- 9. Model Versions
+-- Registry version id of the model behind each prediction ('rules' for the Rule-Based Teacher)
+ALTER TABLE Predictions ADD COLUMN IF NOT EXISTS ModelVersion VARCHAR(64);
+
+-- 10. Applications Table Paging (app.py)
+-- Keyset pages walk the primary key backwards; a status filter walks this index instead
+CREATE INDEX IF NOT EXISTS idx_loanapplications_status_id ON LoanApplications (Status, ApplicationID);
+
+-- 11. Decision Statistics Rollups (dashboard metrics without scanning history)
+-- ApplicationStatusCounts: number of applications per Status (status pie, approval rate, pending queue).
+-- DecisionStats: predictions per hour, Decision, risk level and model version (throughput / approval rate over time).
+-- Statement-level triggers fold each statement's transition table into one delta row per group, so a
+-- 10,000-row COPY or claim adds a couple of rows, not 10,000. Deltas are only ever INSERTed: no counter row
+-- is locked, so writers never wait on (or deadlock over) the rollups. Readers SUM the deltas per group;
+-- compact_decision_stats() (run by the Prediction Agent after each drain) folds them back to one row per group.
+-- Missing values are counted under 'Unknown'.
+CREATE TABLE IF NOT EXISTS ApplicationStatusCounts (
+    Status VARCHAR(50) NOT NULL,
+    Applications BIGINT NOT NULL        -- Delta: negative when applications left this status
+);
+
+CREATE TABLE IF NOT EXISTS DecisionStats (
+    BucketHour TIMESTAMP NOT NULL,      -- date_trunc('hour', Predictions.GeneratedAt)
+    Decision VARCHAR(50) NOT NULL,      -- Approved, Rejected
+    RiskLevel VARCHAR(50) NOT NULL,     -- Low, Medium, High
+    ModelVersion VARCHAR(64) NOT NULL,  -- Registry version, 'rules' for the Rule-Based Teacher
+    Decisions BIGINT NOT NULL
+);
+-- Time-series charts read a recent range of hours
+CREATE INDEX IF NOT EXISTS idx_decisionstats_bucket ON DecisionStats (BucketHour);
+
+CREATE OR REPLACE FUNCTION track_application_status() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO ApplicationStatusCounts (Status, Applications)
+        SELECT COALESCE(Status, 'Unknown'), COUNT(*) FROM new_rows GROUP BY 1;
+    ELSIF TG_OP = 'UPDATE' THEN
+        -- Most updates (leases, financial resets) leave the status alone and net out to nothing
+        INSERT INTO ApplicationStatusCounts (Status, Applications)
+        SELECT Status, SUM(Delta) FROM (
+            SELECT COALESCE(Status, 'Unknown') AS Status, 1 AS Delta FROM new_rows
+            UNION ALL
+            SELECT COALESCE(Status, 'Unknown'), -1 FROM old_rows
+        ) D
+        GROUP BY Status HAVING SUM(Delta) <> 0;
+    ELSE
+        INSERT INTO ApplicationStatusCounts (Status, Applications)
+        SELECT COALESCE(Status, 'Unknown'), -COUNT(*) FROM old_rows GROUP BY 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION track_decisions() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO DecisionStats (BucketHour, Decision, RiskLevel, ModelVersion, Decisions)
+    SELECT date_trunc('hour', GeneratedAt), COALESCE(Decision, 'Unknown'), COALESCE(ModelRiskLevel, 'Unknown'),
+           COALESCE(ModelVersion, 'Unknown'), COUNT(*)
+    FROM new_rows
+    GROUP BY 1, 2, 3, 4;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_status_counts_insert ON LoanApplications;
+CREATE TRIGGER trg_status_counts_insert
+    AFTER INSERT ON LoanApplications REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_application_status();
+
+DROP TRIGGER IF EXISTS trg_status_counts_update ON LoanApplications;
+CREATE TRIGGER trg_status_counts_update
+    AFTER UPDATE ON LoanApplications REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_application_status();
+
+DROP TRIGGER IF EXISTS trg_status_counts_delete ON LoanApplications;
+CREATE TRIGGER trg_status_counts_delete
+    AFTER DELETE ON LoanApplications REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_application_status();
+
+DROP TRIGGER IF EXISTS trg_decision_stats_insert ON Predictions;
+CREATE TRIGGER trg_decision_stats_insert
+    AFTER INSERT ON Predictions REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_decisions();
+
+-- Folds the deltas into one row per group. Safe beside writers and other compactions: new deltas are
+-- invisible to the DELETE, and a delta deleted by a concurrent compaction is skipped, so each is folded once.
+CREATE OR REPLACE FUNCTION compact_decision_stats() RETURNS void AS $$
+BEGIN
+    WITH folded AS (DELETE FROM ApplicationStatusCounts RETURNING Status, Applications)
+    INSERT INTO ApplicationStatusCounts (Status, Applications)
+    SELECT Status, SUM(Applications) FROM folded GROUP BY Status HAVING SUM(Applications) <> 0;
+
+    WITH folded AS (DELETE FROM DecisionStats RETURNING BucketHour, Decision, RiskLevel, ModelVersion, Decisions)
+    INSERT INTO DecisionStats (BucketHour, Decision, RiskLevel, ModelVersion, Decisions)
+    SELECT BucketHour, Decision, RiskLevel, ModelVersion, SUM(Decisions) FROM folded GROUP BY 1, 2, 3, 4;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recounts both rollups from the base tables (backfill on setup; also safe to run by hand).
+-- Writers are blocked for the duration, so no statement is counted twice or missed.
+CREATE OR REPLACE FUNCTION rebuild_decision_stats() RETURNS void AS $$
+BEGIN
+    LOCK TABLE LoanApplications, Predictions IN SHARE MODE;
+    DELETE FROM ApplicationStatusCounts;
+    INSERT INTO ApplicationStatusCounts (Status, Applications)
+    SELECT COALESCE(Status, 'Unknown'), COUNT(*) FROM LoanApplications GROUP BY 1;
+    DELETE FROM DecisionStats;
+    INSERT INTO DecisionStats (BucketHour, Decision, RiskLevel, ModelVersion, Decisions)
+    SELECT date_trunc('hour', GeneratedAt), COALESCE(Decision, 'Unknown'), COALESCE(ModelRiskLevel, 'Unknown'),
+           COALESCE(ModelVersion, 'Unknown'), COUNT(*)
+    FROM Predictions GROUP BY 1, 2, 3, 4;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$ BEGIN PERFORM rebuild_decision_stats(); END $$;
+
+-- 12. Latest Prediction per Application
+-- Applications re-queued by life events collect several predictions; this view is the current one.
+-- Filtering on ApplicationID is pushed into the view, so a lookup is a single probe of
+-- idx_predictions_application_latest (used by the Check Status page and status_api.py).
+CREATE OR REPLACE VIEW LatestPredictions AS
+SELECT DISTINCT ON (ApplicationID)
+    PredictionID, ApplicationID, PredictedEligibilityScore, RecommendedLoanAmount, ModelRiskLevel, Reasoning,
+    GeneratedAt, Decision, FeatureFingerprint, ModelVersion
+FROM Predictions
+ORDER BY ApplicationID, PredictionID DESC;
@@ -0,0 +1,94 @@
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import db_config
+import dashboard_queries
+
+# Application Status Lookup
+# lookup_status() is shared by the dashboard's Check Status page and a small local HTTP endpoint:
+#     python status_api.py [--host 127.0.0.1] [--port 8081]
+#     GET /status/<ApplicationID>   -> 200 JSON, 404 if unknown, 400 if the id is not a number
+#     GET /health                   -> 200 {"ok": true}
+# One indexed query per lookup: primary key joins plus one probe for the latest prediction
+# (the LatestPredictions view, see setup_postgres.sql), so lookups stay in the low milliseconds
+# however many predictions accumulate. Connections come from the db_config pool.
+STATUS_API_HOST = os.environ.get('STATUS_API_HOST', '127.0.0.1')
+STATUS_API_PORT = int(os.environ.get('STATUS_API_PORT', 8081))
+
+def lookup_status(application_id):
+    # Returns the application's status and latest prediction as a dict (STATUS_QUERY column names),
+    # or None if there is no such application. Raises db_config.DatabaseUnavailable without a database.
+    with db_config.connection() as conn:
+        if not conn:
+            raise db_config.DatabaseUnavailable("Database unavailable")
+        cursor = conn.cursor()
+        cursor.execute(dashboard_queries.STATUS_QUERY, (application_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip([column[0] for column in cursor.description], row))
+
+def to_json(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+class StatusHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        parts = self.path.split('?')[0].strip('/').split('/')
+        if parts == ['health']:
+            return self.send_json(200, {'ok': True})
+        if len(parts) != 2 or parts[0] != 'status':
+            return self.send_json(404, {'error': 'Not found. Use /status/<ApplicationID>'})
+        try:
+            application_id = int(parts[1])
+        except ValueError:
+            return self.send_json(400, {'error': f"Invalid ApplicationID '{parts[1]}'"})
+
+        started = time.perf_counter()
+        try:
+            status = lookup_status(application_id)
+        except db_config.DatabaseUnavailable as e:
+            return self.send_json(503, {'error': str(e)})
+        except Exception as e:
+            return self.send_json(500, {'error': str(e)})
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if status is None:
+            return self.send_json(404, {'error': f"Application {application_id} not found"})
+        self.send_json(200, status, {'Server-Timing': f"db;dur={elapsed_ms:.2f}"})
+
+    def send_json(self, code, payload, headers=None):
+        body = json.dumps(payload, default=to_json).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass # One line per request would swamp the console under load
+
+def serve(host=STATUS_API_HOST, port=STATUS_API_PORT):
+    server = ThreadingHTTPServer((host, port), StatusHandler)
+    print(f"Status API listening on http://{host}:{port}/status/<ApplicationID>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local HTTP endpoint for single-application status lookups.")
+    parser.add_argument('--host', default=STATUS_API_HOST)
+    parser.add_argument('--port', type=int, default=STATUS_API_PORT)
+    args = parser.parse_args()
+    serve(args.host, args.port)
@@ -41,6 +41,97 @@ def check_imports():
     except ImportError as e:
         print(f"[FAIL] agent_predictor import error: {e}")
 
+def check_teacher_parity(n=5000):
+    # The vectorized Rule-Based Teacher must produce byte-identical decisions to the scalar one
+    print("\nChecking Rule Engine Parity...")
+    try:
+        from decimal import Decimal
+        import generate_data
+        import agent_predictor
+    except ImportError as e:
+        print(f"[SKIP] Parity check unavailable: {e}")
+        return True
+
+    def money(x):
+        return Decimal(str(round(x, 2)))
+
+    rows = []
+    for i in range(n):
+        app = generate_data.generate_applicant()
+        fin = generate_data.generate_financials(app['EmploymentStatus'])
+        loan = generate_data.generate_loan_request(fin['AnnualIncome'], fin['CollateralValue'])
+        rows.append((i, money(loan['RequestAmount']), money(fin['AnnualIncome']), fin['CreditScore'],
+                     money(fin['ExistingDebt']), money(fin['DebtToIncomeRatio']), money(fin['CollateralValue']),
+                     fin['AccountAgeDays'], fin['AvgTransactionCount'], loan['ProcessingPriority'], app['LoyaltyPoints']))
+
+    # Rule boundaries and NULL columns
+    rows += [
+        (n, Decimal('500000.00'), Decimal('250000.00'), 600, Decimal('0'), Decimal('0.50'), Decimal('0'), 1, 1, 1, 1),
+        (n + 1, Decimal('9000000.00'), Decimal('1000000.00'), 700, Decimal('0'), Decimal('0.10'), Decimal('100.00'), 1, 1, 1, 1),
+        (n + 2, Decimal('100.00'), Decimal('249999.99'), 599, Decimal('0'), Decimal('0.51'), None, 1, 1, 1, 1),
+        (n + 3, None, None, None, None, None, None, None, None, None, None),
+    ]
+
+    batch = agent_predictor.evaluate_applications_batch(*agent_predictor.teacher_columns(rows))
+    mismatches = 0
+    for i, row in enumerate(rows):
+        if agent_predictor.teacher_result(batch, i) != agent_predictor.evaluate_application(row):
+            mismatches += 1
+
+    if mismatches:
+        print(f"[FAIL] {mismatches}/{len(rows)} decisions differ between scalar and vectorized rules")
+        return False
+    print(f"[OK] {len(rows)} vectorized decisions match evaluate_application")
+    return True
+
+def check_numpy_parity(n=20000, atol=1e-5):
+    # The NumPy engine must agree with the torch model it was converted from, and the
+    # predictor must import without torch (its cold-start saving)
+    print("\nChecking NumPy Inference Parity...")
+    try:
+        import tempfile
+        import subprocess
+        import numpy as np
+        import torch
+        import loan_model
+        import numpy_inference
+    except ImportError as e:
+        print(f"[SKIP] Parity check unavailable: {e}")
+        return True
+
+    torch.manual_seed(0)
+    model = loan_model.LoanNet().eval()
+    rng = np.random.default_rng(0)
+    features = rng.random((n, len(loan_model.FEATURE_COLUMNS)), dtype=np.float32)
+    features[:5] = [0.0, 2.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0] # Uncapped credit score, all-zero inputs
+    with torch.no_grad():
+        for layer in (model.fc1, model.fc2, model.fc3):
+            layer.weight.mul_(4) # Push outputs towards 0 and 1 as a trained model does
+    expected = np.asarray(loan_model.predict_batch(model, features))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Round trip through model.pth -> .npz, as the registry does
+        pth = os.path.join(tmp, 'model.pth')
+        npz = os.path.join(tmp, 'model.npz')
+        torch.save(model.state_dict(), pth)
+        numpy_inference.convert_weights(pth, npz)
+        actual = np.asarray(numpy_inference.NumpyLoanNet.load(npz).predict(features, chunk_size=4096))
+
+    diff = float(np.max(np.abs(actual - expected)))
+    if diff > atol or not np.array_equal(actual > 0.5, expected > 0.5):
+        print(f"[FAIL] NumPy LoanNet differs from torch (max abs diff {diff:.2e}, tolerance {atol:.0e})")
+        return False
+    print(f"[OK] {n} NumPy predictions match torch (max abs diff {diff:.2e})")
+
+    probe = "import sys, agent_predictor; sys.exit(1 if 'torch' in sys.modules else 0)"
+    result = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode != 0:
+        print("[FAIL] agent_predictor imports torch; the numpy backend should start without it")
+        return False
+    print("[OK] agent_predictor imports without torch")
+    return True
+
 def main():
     print("--- Verifying CLOUD Version Files ---")
     files = [
@@ -48,6 +139,7 @@ def main():
         "generate_data.py", 
         "agent_predictor.py", 
         "loan_model.py", 
+        "loan_features.py",
         "app.py",
         "requirements.txt",
         "db_config.py"
@@ -60,6 +152,10 @@ def main():
             
     if all_exist:
         check_imports()
+        if not check_teacher_parity():
+            sys.exit(1)
+        if not check_numpy_parity():
+            sys.exit(1)
         print("\n--- READY FOR CLOUD DEPLOYMENT ---")
         print("1. Push this folder to GitHub context or as a new repo.")
         print("2. Connect Supabase & Streamlit.")